@@ -0,0 +1,63 @@
+"""
+Shared pytest fixtures
+"""
+
+import os
+
+import pytest
+
+TEST_MASTER_PASSWORD = "test_password_123"
+
+# Dummy Kite credentials, so modules that load the global config can be imported
+TEST_KITE_ENV = {
+    "KITE_API_KEY": "test_api_key_123",
+    "KITE_API_SECRET": "test_secret_456",
+    "KITE_USER_ID": "TEST123",
+    "KITE_PASSWORD": "test_password",
+    "KITE_TOTP_SECRET": "JBSWY3DPEHPK3PXP",
+}
+
+
+def make_test_encryption():
+    """Create the CredentialEncryption shared by the tests"""
+    from src.utils.encryption import CredentialEncryption
+    
+    # The module-level credential manager reads the same files, so give it
+    # the password too (otherwise it would prompt or fail non-interactively)
+    os.environ['KITE_MASTER_PASSWORD'] = TEST_MASTER_PASSWORD
+    return CredentialEncryption(master_password=TEST_MASTER_PASSWORD)
+
+
+def cleanup_test_files():
+    """Clean up test files"""
+    try:
+        test_files = [
+            "config/credentials.encrypted",
+            "config/.salt"
+        ]
+        
+        for file_path in test_files:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                print(f"   Cleaned up: {file_path}")
+        
+        # Remove test environment variable
+        if 'KITE_MASTER_PASSWORD' in os.environ:
+            del os.environ['KITE_MASTER_PASSWORD']
+            
+    except Exception as e:
+        print(f"   Cleanup error: {e}")
+
+
+@pytest.fixture
+def kite_env(monkeypatch):
+    """Provide Kite credentials through the environment for the test"""
+    for name, value in TEST_KITE_ENV.items():
+        monkeypatch.setenv(name, value)
+
+
+@pytest.fixture(scope="session")
+def encryption():
+    """One CredentialEncryption for the whole session, removing its files afterwards"""
+    yield make_test_encryption()
+    cleanup_test_files()
\ No newline at end of file
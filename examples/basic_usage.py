@@ -10,23 +10,54 @@ This example demonstrates how to:
 5. Monitor performance
 """
 
-import time
+import queue
+import signal
+import threading
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from typing import List
 
+import numpy as np
+
 # Import our optimized modules
 from src.auth.kite_auth import KiteAuthenticator
 from src.datafeed.datafeed import DataFeedService
 from src.datafeed.tick_data import TickData
+from src.datafeed.tick_kernels import tick_action, ACTION_SIGNAL
 from src.utils.config import config
 
 # Set up logging
+# Records are queued and written by a background listener thread so the
+# tick processing path never blocks on stream I/O
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    level=config.logging.level,
+    format='%(message)s',  # Full format is applied by the listener's handler
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Cached level check for the tick path (refreshed on SIGHUP)
+info_enabled = logger.isEnabledFor(logging.INFO)
+
+
+def reload_log_level(signum=None, frame=None):
+    """Reload the configuration, apply its log level and re-probe the cached check"""
+    global info_enabled
+    config.reload()
+    try:
+        logging.getLogger().setLevel(config.logging.level)
+    except ValueError as e:
+        logger.error(f"Invalid log level in configuration: {e}")
+    info_enabled = logger.isEnabledFor(logging.INFO)
+
 
 class BasicTradingExample:
     """
@@ -38,6 +69,7 @@ class BasicTradingExample:
         self.authenticator = None
         self.datafeed = None
         self.running = False
+        self.stop_event = threading.Event()  # Wakes the monitor loop on stop
         
         # Example instruments (replace with your own)
         self.instruments = [
@@ -75,8 +107,8 @@ class BasicTradingExample:
                 access_token=self.authenticator.get_access_token()
             )
             
-            # Add our tick processing callback
-            self.datafeed.add_tick_callback(self.process_tick)
+            # Add our batched tick processing callback
+            self.datafeed.add_tick_batch_callback(self.process_tick_batch)
             
             logger.info("✅ Data feed setup complete")
             return True
@@ -85,44 +117,46 @@ class BasicTradingExample:
             logger.error(f"Data feed setup failed: {e}")
             return False
     
-    def process_tick(self, tick: TickData):
+    def process_tick_batch(self, tokens: np.ndarray, prices: np.ndarray, changes: np.ndarray):
         """
-        Process individual ticks
+        Process a batch of ticks delivered as arrays
+        
+        This is where you would implement your trading logic. The filter
+        runs over the whole batch and only significant moves are visited
+        in Python. Exceptions are caught and logged once per batch by the
+        data feed.
         
-        This is where you would implement your trading logic
+        For indicators, resolve rows once via self.datafeed.get_current_bar_row()
+        and read self.datafeed.bars_soa[row] (RSI, moving averages, etc.)
         """
-        try:
-            # Example: Log significant price movements
-            if abs(tick.change_percent) > 1.0:  # More than 1% change
+        # Branchless classification: bit 0 = more than 1% change,
+        # bit 1 = more than 2% change (trading signal)
+        abs_changes = np.abs(changes)
+        flags = (abs_changes > 1.0).view(np.uint8)
+        flags |= (abs_changes > 2.0).view(np.uint8) << 1
+        
+        for i in np.flatnonzero(flags):
+            if info_enabled:
                 logger.info(
-                    f"📈 Large move: {tick.instrument_token} "
-                    f"Price: {tick.last_price:.2f} "
-                    f"Change: {tick.change_percent:.2f}%"
+                    "📈 Large move: %d Price: %.2f Change: %.2f%%",
+                    tokens[i], prices[i], changes[i]
                 )
             
-            # Example: Get latest bars for technical analysis
-            current_bar = self.datafeed.get_current_bar(tick.instrument_token)
-            if current_bar:
-                # You could calculate indicators here
-                # RSI, moving averages, etc.
-                pass
-            
             # Example: Check for trading signals
-            if self.should_trade(tick):
-                logger.info(f"🔔 Trading signal for {tick.instrument_token}")
+            if flags[i] & 2:
+                if info_enabled:
+                    logger.info("🔔 Trading signal for %d", tokens[i])
                 # Here you would place orders via execution module
-                
-        except Exception as e:
-            logger.error(f"Error processing tick: {e}")
     
     def should_trade(self, tick: TickData) -> bool:
         """
         Example trading logic
         
-        Replace this with your actual strategy
+        Replace this with your actual strategy. process_tick_batch applies
+        the same thresholds to a whole batch at once.
         """
         # Very simple example: buy on 2% dip, sell on 2% gain
-        return abs(tick.change_percent) > 2.0
+        return tick_action(tick.change_percent) == ACTION_SIGNAL
     
     def start_trading(self):
         """Start the trading system"""
@@ -143,6 +177,7 @@ class BasicTradingExample:
                 return False
             
             self.running = True
+            self.stop_event.clear()
             logger.info("✅ Trading system started successfully")
             
             # Monitor performance
@@ -159,10 +194,8 @@ class BasicTradingExample:
         logger.info("📊 Starting performance monitoring...")
         
         try:
-            while self.running:
-                # Wait 30 seconds between performance reports
-                time.sleep(30)
-                
+            # Wait 30 seconds between performance reports (returns early on stop)
+            while not self.stop_event.wait(30.0):
                 # Get statistics
                 stats = self.datafeed.get_statistics()
                 
@@ -193,6 +226,7 @@ class BasicTradingExample:
         try:
             logger.info("🛑 Stopping trading system...")
             self.running = False
+            self.stop_event.set()
             
             if self.datafeed:
                 self.datafeed.stop()
@@ -233,6 +267,10 @@ class BasicTradingExample:
 
 def main():
     """Main function"""
+    # Change the log level without a restart: edit logging.level, then kill -HUP
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, reload_log_level)
+    
     # Create and run trading system
     trading_system = BasicTradingExample()
     
@@ -13,10 +13,14 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+# Banner rules
+HEADER_RULE = "=" * 40
+SECTION_RULE = "=" * 30
+
 def test_auto_login():
     """Test the complete auto-login flow"""
     print("🔐 Testing Auto-Login Flow")
-    print("=" * 40)
+    print(HEADER_RULE)
     
     try:
         from utils.encryption import credential_manager
@@ -56,6 +60,7 @@ def test_auto_login():
         # Step 3: Test configuration loading
         print("\n3. Testing configuration loading...")
         
+        # Cached on the config manager, so this does not decrypt again
         kite_config = config.kite
         
         if not kite_config.api_key:
@@ -81,7 +86,7 @@ def test_auto_login():
         
         # Step 5: Summary
         print("\n🎉 Auto-Login Test Results")
-        print("=" * 30)
+        print(SECTION_RULE)
         print("✅ Credential storage working")
         print("✅ Credential decryption working")
         print("✅ Configuration loading working")
@@ -104,7 +109,7 @@ def test_auto_login():
 def show_auto_login_setup():
     """Show how to set up true auto-login"""
     print("\n\n📋 How to Enable True Auto-Login")
-    print("=" * 40)
+    print(HEADER_RULE)
     print()
     print("1. Set master password in environment:")
     print("   export KITE_MASTER_PASSWORD='your_master_password'")
@@ -7,13 +7,20 @@ This script automates the complete setup process for new users.
 
 import sys
 import os
+import compileall
 import subprocess
 from pathlib import Path
 
+SRC_DIR = str(Path(__file__).resolve().parent.parent / "src")
+
+# Banner rules
+HEADER_RULE = "=" * 50
+SECTION_RULE = "=" * 30
+
 def print_header():
     """Print welcome header"""
     print("🚀 Kite HFT Optimized - Quick Start Setup")
-    print("=" * 50)
+    print(HEADER_RULE)
     print("This script will help you set up everything in 5 minutes!")
     print()
 
@@ -50,17 +57,30 @@ def check_dependencies():
         except ImportError:
             print("📦 Installing dependencies...")
             
-            # Install dependencies
-            result = subprocess.run([
-                sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
-            ], capture_output=True, text=True)
+            # Install dependencies in-process when pip is importable
+            # (avoids starting a second interpreter)
+            try:
+                from pip._internal.cli.main import main as pip_main
+            except ImportError:
+                pip_main = None
+            
+            if pip_main is not None:
+                returncode = pip_main(["install", "-r", "requirements.txt"])
+            else:
+                # Stream pip output as it arrives instead of buffering it all
+                with subprocess.Popen([
+                    sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
+                ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1) as process:
+                    for line in process.stdout:
+                        sys.stdout.write(line)
+                    returncode = process.wait()
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("✅ Dependencies installed successfully")
                 return True
             else:
                 print("❌ Failed to install dependencies")
-                print(f"   Error: {result.stderr}")
+                print("   See pip output above for details")
                 return False
                 
     except Exception as e:
@@ -72,15 +92,16 @@ def test_installation():
     print("\n3️⃣ Testing installation...")
     
     try:
-        # Add src to path
-        sys.path.insert(0, "src")
-        
         # Test basic imports
         from utils.encryption import credential_manager
         from utils.config import config
         
         print("✅ Core modules imported successfully")
         
+        # Precompile sources so later runs skip bytecode compilation on import
+        compileall.compile_dir(SRC_DIR, quiet=1, workers=0)
+        print("✅ Modules precompiled to bytecode")
+        
         # Test encryption
         print("   Testing encryption system...")
         from utils.encryption import CredentialEncryption
@@ -115,7 +136,6 @@ def setup_credentials():
     
     try:
         # Check if already configured
-        sys.path.insert(0, "src")
         from utils.encryption import credential_manager
         
         if credential_manager.is_configured():
@@ -173,12 +193,12 @@ def run_credential_setup():
     try:
         print("\n🚀 Launching credential setup...")
         
-        # Run the credential setup script
-        result = subprocess.run([
-            sys.executable, "scripts/setup_credentials.py"
-        ], text=True)
+        # Run the credential setup script in-process (shares the loaded
+        # credential manager instead of spawning a second interpreter).
+        # The scripts directory is already on sys.path when run as a script.
+        import setup_credentials as setup_credentials_script
         
-        if result.returncode == 0:
+        if setup_credentials_script.main() == 0:
             print("✅ Credential setup completed")
             return True
         else:
@@ -194,8 +214,6 @@ def test_authentication():
     print("\n5️⃣ Testing authentication...")
     
     try:
-        sys.path.insert(0, "src")
-        
         # Test configuration loading
         from utils.config import config
         kite_config = config.kite
@@ -227,7 +245,7 @@ def test_authentication():
 def show_next_steps():
     """Show user what to do next"""
     print("\n🎉 Setup Complete!")
-    print("=" * 30)
+    print(SECTION_RULE)
     print()
     print("✅ Dependencies installed")
     print("✅ Credentials configured securely")
@@ -261,6 +279,10 @@ def main():
     try:
         print_header()
         
+        # Add src to path once for all steps
+        if SRC_DIR not in sys.path:
+            sys.path.insert(0, SRC_DIR)
+        
         # Check prerequisites
         if not check_python_version():
             return 1
@@ -6,96 +6,359 @@ Scans the entire Git history for potential credential leaks
 before uploading to GitHub.
 """
 
+import argparse
+import fnmatch
+import hashlib
+import os
+import sqlite3
 import subprocess
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def run_command(cmd):
-    """Run shell command and return output"""
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Patterns to look for (actual credential values, not just variable names)
+DANGEROUS_PATTERNS = (
+    r'api_key["\s]*[:=]["\s]*[a-zA-Z0-9]{12,}',  # Real API keys are longer
+    r'api_secret["\s]*[:=]["\s]*[a-zA-Z0-9]{20,}',  # Real secrets are longer
+    r'totp_secret["\s]*[:=]["\s]*[A-Z0-9]{16,}',  # Real TOTP secrets
+    r'KITE_API_KEY["\s]*[:=]["\s]*[a-zA-Z0-9]{12,}',
+    r'KITE_API_SECRET["\s]*[:=]["\s]*[a-zA-Z0-9]{20,}',
+    r'token["\s]*[:=]["\s]*[a-zA-Z0-9]{25,}',  # Real tokens are long
+)
+
+# All patterns in one alternation so each object is traversed once; the
+# capturing group that matched identifies the pattern (match.lastindex).
+# Compiled as bytes so raw git objects are matched without decoding.
+DANGEROUS_RE = re.compile(
+    "|".join(f"({pattern})" for pattern in DANGEROUS_PATTERNS).encode(), re.IGNORECASE
+)
+
+# The same alternation as a POSIX ERE for git's own matchers (-G, --grep),
+# which have no \s shorthand inside bracket expressions
+DANGEROUS_ERE = "|".join(f"({pattern})" for pattern in DANGEROUS_PATTERNS).replace(r"\s", "[:space:]")
+
+# Every dangerous pattern contains one of these literals (matched lowercased),
+# so objects without any of them cannot match and skip the regex pass
+PREFILTER_LITERALS = (b"api_", b"secret", b"token")
+
+def compile_hyperscan_database():
+    """Compile DANGEROUS_PATTERNS into a Hyperscan block-mode database"""
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[pattern.encode() for pattern in DANGEROUS_PATTERNS],
+        ids=list(range(len(DANGEROUS_PATTERNS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(DANGEROUS_PATTERNS),
+    )
+    return database
+
+# Optional SIMD prefilter; without hyperscan every object goes through `re`
+HYPERSCAN_DB = compile_hyperscan_database() if hyperscan else None
+
+def hyperscan_has_match(content):
+    """Return True if any dangerous pattern occurs in the raw object bytes"""
+    hits = []
+    HYPERSCAN_DB.scan(content, match_event_handler=lambda *event: hits.append(event[0]))
+    return bool(hits)
+
+# Objects larger than one chunk are matched as a stream instead of in memory
+STREAM_CHUNK_SIZE = 1 << 16
+STREAM_OVERLAP = 256
+
+class GitBatchReader:
+    """Persistent `git cat-file --batch` pipe for reading many objects"""
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process.wait()
+
+    def request(self, sha):
+        """Request an object and return its size, or None if it does not exist
+
+        The body must then be consumed with read_body() or iter_body()
+        before the next request.
+        """
+        self.process.stdin.write(sha.encode() + b"\n")
+        self.process.stdin.flush()
+        
+        # Response is framed as "<sha> <type> <size>\n<payload>\n"
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        return int(header[2])
+
+    def read_body(self, size):
+        """Read the whole body of the requested object"""
+        content = self.process.stdout.read(size + 1)
+        return content[:-1]
+
+    def iter_body(self, size, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield the body of the requested object in chunks"""
+        remaining = size
+        while remaining:
+            chunk = self.process.stdout.read(min(chunk_size, remaining))
+            remaining -= len(chunk)
+            yield chunk
+        self.process.stdout.read(1)  # Trailing newline of the frame
+
+    def read(self, sha):
+        """Return the raw bytes of an object, or None if it does not exist"""
+        size = self.request(sha)
+        if size is None:
+            return None
+        return self.read_body(size)
+
+def scan_stream(chunks, pattern, overlap=STREAM_OVERLAP):
+    """Yield pattern matches over a chunked byte stream
+
+    Only `overlap` bytes (plus any match still touching the end of the
+    buffer) are carried between chunks, so a match is never split across
+    a boundary and memory stays bounded regardless of object size.
+    """
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        settled = len(buffer) - overlap
+        keep_from = max(settled, 0)
+        for match in pattern.finditer(buffer):
+            if match.end() >= settled:
+                # May continue in the next chunk; rescan it from its start
+                keep_from = min(keep_from, match.start())
+                break
+            yield match
+        buffer = buffer[keep_from:]
+    yield from pattern.finditer(buffer)
+
+def iter_history_objects(log_lines):
+    """Yield (commit, sha, path) for each object in streamed `git log --raw` output
+
+    The commit object itself is yielded with a path of None, followed by
+    every blob that commit introduces.
+    """
+    commit = None
+    for line in log_lines:
+        if line.startswith(':'):
+            # ":<old mode> <new mode> <old sha> <new sha> <status>\t<path>"
+            fields, path = line.rstrip('\n').split('\t', 1)
+            fields = fields.split()
+            if fields[1].startswith('100') and fields[3].strip('0'):
+                yield commit, fields[3], path
+        elif line.strip():
+            commit = line.strip()
+            yield commit, commit, None
+
+def list_history_objects(cmd):
+    """Run a git log listing and return (objects, error) for its output"""
+    log = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1 << 20,
+    )
+    objects = list(iter_history_objects(log.stdout))
+    
+    _, stderr = log.communicate()
+    return objects, (stderr if log.returncode != 0 else None)
+
+# Exclude patterns (things that look like credentials but aren't)
+SAFE_PATTERNS = (
+    r'password.*=.*"test',  # Test passwords
+    r'password.*=.*"your_',  # Template passwords  
+    r'password.*=.*"password',  # Generic examples
+    r'master_password.*=.*getenv',  # Environment variable access
+    r'password.*=.*getpass',  # Password input
+    r'\.password',  # Object attributes
+    r'password:.*Optional',  # Type annotations
+    r'password:.*str',  # Type annotations
+    r'api_key.*=.*"abc123',  # Documentation examples
+    r'api_key.*=.*"example',  # Documentation examples
+    r'api_secret.*=.*"abc123',  # Documentation examples
+    r'`api_key.*=',  # Markdown code examples
+    r'- ❌ Real credentials',  # Documentation examples
+    r'\*\*Example:\*\*',  # Documentation examples
+)
+
+SAFE_RE = re.compile("|".join(f"(?:{pattern})" for pattern in SAFE_PATTERNS).encode(), re.IGNORECASE)
+
+# Vendored and generated paths git log should not emit at all
+HISTORY_EXCLUDES = [
+    ":(exclude,glob)**/node_modules/**",
+    ":(exclude)*.lock",
+    ":(exclude)*.min.js",
+]
+
+# Below this many objects per worker, process startup costs more than it saves
+MIN_OBJECTS_PER_WORKER = 256
+
+# Git objects are immutable, so an object found clean once stays clean until
+# the patterns change; the version is derived from the patterns themselves
+SCAN_CACHE_PATH = Path.home() / ".cache" / "kite-hft" / "sec-scan.db"
+SCAN_VERSION = hashlib.sha1(
+    "\n".join(DANGEROUS_PATTERNS + SAFE_PATTERNS).encode()
+).hexdigest()[:12]
+
+def open_scan_cache():
+    """Open the clean-object cache, or return None if it is unavailable"""
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return result.stdout, result.stderr, result.returncode
-    except Exception as e:
-        return "", str(e), 1
+        SCAN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        cache = sqlite3.connect(SCAN_CACHE_PATH)
+        cache.execute("CREATE TABLE IF NOT EXISTS clean(sha TEXT PRIMARY KEY, v TEXT)")
+        return cache
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  Scan cache unavailable, scanning everything: {e}")
+        return None
 
-def scan_git_history():
-    """Scan entire Git history for potential secrets"""
-    print("🔍 Scanning Git history for potential secrets...")
+def match_object(reader, size):
+    """Return the dangerous-pattern matches in the object just requested
+
+    Large objects are matched as a stream, so the returned iterator must
+    be exhausted to keep the cat-file pipe in sync.
+    """
+    if size > STREAM_CHUNK_SIZE:
+        return scan_stream(reader.iter_body(size), DANGEROUS_RE)
     
-    # Patterns to look for (actual credential values, not just variable names)
-    dangerous_patterns = [
-        r'api_key["\s]*[:=]["\s]*[a-zA-Z0-9]{12,}',  # Real API keys are longer
-        r'api_secret["\s]*[:=]["\s]*[a-zA-Z0-9]{20,}',  # Real secrets are longer
-        r'totp_secret["\s]*[:=]["\s]*[A-Z0-9]{16,}',  # Real TOTP secrets
-        r'KITE_API_KEY["\s]*[:=]["\s]*[a-zA-Z0-9]{12,}',
-        r'KITE_API_SECRET["\s]*[:=]["\s]*[a-zA-Z0-9]{20,}',
-        r'token["\s]*[:=]["\s]*[a-zA-Z0-9]{25,}',  # Real tokens are long
-    ]
+    content = reader.read_body(size)
     
-    # Exclude patterns (things that look like credentials but aren't)
-    safe_patterns = [
-        r'password.*=.*"test',  # Test passwords
-        r'password.*=.*"your_',  # Template passwords  
-        r'password.*=.*"password',  # Generic examples
-        r'master_password.*=.*getenv',  # Environment variable access
-        r'password.*=.*getpass',  # Password input
-        r'\.password',  # Object attributes
-        r'password:.*Optional',  # Type annotations
-        r'password:.*str',  # Type annotations
-        r'api_key.*=.*"abc123',  # Documentation examples
-        r'api_key.*=.*"example',  # Documentation examples
-        r'api_secret.*=.*"abc123',  # Documentation examples
-        r'`api_key.*=',  # Markdown code examples
-        r'- ❌ Real credentials',  # Documentation examples
-        r'\*\*Example:\*\*',  # Documentation examples
-    ]
+    # Cheap C-speed substring test rules out most objects up front
+    lowered = content.lower()
+    if not any(literal in lowered for literal in PREFILTER_LITERALS):
+        return ()
     
-    # Get all commits
-    stdout, stderr, code = run_command("git log --all --oneline")
-    if code != 0:
-        print(f"❌ Failed to get Git history: {stderr}")
-        return False
-    
-    commits = [line.split()[0] for line in stdout.strip().split('\n') if line]
-    print(f"   Scanning {len(commits)} commits...")
+    # Hyperscan screens the raw bytes in one C call; only objects
+    # with a hit are matched again for exact reporting
+    if HYPERSCAN_DB is not None and not hyperscan_has_match(content):
+        return ()
     
+    return DANGEROUS_RE.finditer(content)
+
+def scan_objects(objects):
+    """Scan (commit, sha, path) objects and return the violations found
+
+    Runs in pool workers, so it opens its own cat-file pipe; pipes are
+    never shared between processes.
+    """
     violations = []
     
-    for commit in commits:
-        # Get commit content
-        stdout, stderr, code = run_command(f"git show {commit}")
-        if code != 0:
-            continue
-        
-        commit_content = stdout
-        
-        # Check each pattern
-        for pattern in dangerous_patterns:
-            matches = re.findall(pattern, commit_content, re.IGNORECASE)
-            if matches:
+    # One long-running cat-file process serves every object lookup
+    with GitBatchReader() as reader:
+        for commit, sha, path in objects:
+            size = reader.request(sha)
+            if size is None:
+                continue
+            
+            # Check all patterns in a single pass over the raw bytes, grouping
+            # hits by pattern; only the (rare) matches themselves are decoded
+            filtered_matches = {}
+            for match in match_object(reader, size):
                 # Filter out safe patterns
-                filtered_matches = []
-                for match in matches:
-                    is_safe = False
-                    for safe_pattern in safe_patterns:
-                        if re.search(safe_pattern, match, re.IGNORECASE):
-                            is_safe = True
-                            break
-                    if not is_safe:
-                        filtered_matches.append(match)
-                
-                if filtered_matches:
-                    violations.append({
-                        'commit': commit,
-                        'pattern': pattern,
-                        'matches': filtered_matches
-                    })
+                if not SAFE_RE.search(match.group(0)):
+                    pattern = DANGEROUS_PATTERNS[match.lastindex - 1]
+                    text = match.group(0).decode('utf-8', errors='replace')
+                    filtered_matches.setdefault(pattern, []).append(text)
+            
+            for pattern, matches in filtered_matches.items():
+                violations.append({
+                    'commit': commit,
+                    'object': sha,
+                    'file': path,
+                    'pattern': pattern,
+                    'matches': matches
+                })
+    
+    return violations
+
+def scan_git_history(since=None):
+    """Scan entire Git history for potential secrets
+    
+    Args:
+        since: Optional git date (e.g. "2.years") limiting how far back to scan
+    """
+    print("🔍 Scanning Git history for potential secrets...")
+    
+    # Merge commits only repeat content already introduced by their parents
+    log_args = ["--all", "--no-merges", "--regexp-ignore-case"]
+    if since:
+        log_args.append(f"--since={since}")
+    
+    # git's pickaxe (-G) walks the diffs in C and lists only the commits that
+    # add or remove a matching line, with just the matching files; vendored
+    # paths are filtered inside git before reaching Python
+    pickaxe_cmd = (
+        ["git", "log", *log_args, "-G", DANGEROUS_ERE, "--format=%H", "--raw", "--no-abbrev", "--no-renames"]
+        + ["--", "."] + HISTORY_EXCLUDES
+    )
+    
+    # -G never looks at commit messages, so those are searched separately
+    message_cmd = ["git", "log", *log_args, "--extended-regexp", f"--grep={DANGEROUS_ERE}", "--format=%H"]
+    
+    # Only object ids of candidates are kept; contents are verified per shard
+    objects = []
+    for cmd in (pickaxe_cmd, message_cmd):
+        listed, error = list_history_objects(cmd)
+        if error is not None:
+            print(f"❌ Failed to get Git history: {error}")
+            return False
+        objects.extend(listed)
+    
+    # Read each unique object once: an unchanged blob reappears under every
+    # commit that re-adds it. git log lists newest first, so the last
+    # occurrence kept here is the commit that introduced the object.
+    unique_objects = {}
+    for obj in objects:
+        unique_objects[obj[1]] = obj
+    objects = list(unique_objects.values())
+    
+    commit_count = sum(1 for _, _, path in objects if path is None)
+    
+    # Skip objects already found clean by a previous run with these patterns
+    cache = open_scan_cache()
+    if cache is not None:
+        clean = {row[0] for row in cache.execute("SELECT sha FROM clean WHERE v=?", (SCAN_VERSION,))}
+        objects = [obj for obj in objects if obj[1] not in clean]
+    
+    # Regex matching is CPU-bound, so shard across processes rather than threads
+    workers = min(os.cpu_count() or 1, len(objects) // MIN_OBJECTS_PER_WORKER)
+    if workers > 1:
+        shards = [objects[i::workers] for i in range(workers)]
+        violations = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_violations in executor.map(scan_objects, shards):
+                violations.extend(shard_violations)
+    else:
+        violations = scan_objects(objects)
+    
+    if cache is not None:
+        flagged = {violation['object'] for violation in violations}
+        with cache:
+            cache.executemany(
+                "INSERT OR REPLACE INTO clean(sha, v) VALUES (?, ?)",
+                [(sha, SCAN_VERSION) for _, sha, _ in objects if sha not in flagged],
+            )
+        cache.close()
+    
+    print(f"   Scanned {commit_count} candidate commits")
     
     if violations:
         print("❌ SECURITY VIOLATIONS FOUND:")
         for violation in violations:
             print(f"   Commit: {violation['commit']}")
+            if violation['file']:
+                print(f"   File: {violation['file']}")
             print(f"   Pattern: {violation['pattern']}")
             print(f"   Matches: {violation['matches']}")
             print()
@@ -104,35 +367,38 @@ def scan_git_history():
         print("✅ No credential patterns found in Git history")
         return True
 
+DANGEROUS_FILES = (
+    "config/credentials.yaml",
+    "config/secrets.yaml", 
+    "config/.env",
+    ".env",
+    "*.key",
+    "*.pem",
+    "*token.json",
+    "config/credentials.encrypted",  # This is OK, but let's check
+)
+
+# Matched against both the file name and its path relative to the repo root
+DANGEROUS_FILE_RE = re.compile("|".join(fnmatch.translate(pattern) for pattern in DANGEROUS_FILES))
+
+# Directories never worth descending into
+SKIP_DIRS = frozenset((".git", "node_modules"))
+
 def scan_current_files():
     """Scan current files for potential secrets"""
     print("\n🔍 Scanning current files for potential secrets...")
     
-    dangerous_files = [
-        "config/credentials.yaml",
-        "config/secrets.yaml", 
-        "config/.env",
-        ".env",
-        "*.key",
-        "*.pem",
-        "*token.json",
-        "config/credentials.encrypted"  # This is OK, but let's check
-    ]
-    
     violations = []
     
-    # Check for dangerous files
-    for pattern in dangerous_files:
-        stdout, stderr, code = run_command(f"find . -name '{pattern}' -type f")
-        if stdout.strip():
-            files = stdout.strip().split('\n')
-            for file in files:
-                if file and not file.endswith('credentials.encrypted'):  # Encrypted files are OK
-                    violations.append(f"Dangerous file found: {file}")
-    
-    # Check .gitignore coverage
-    stdout, stderr, code = run_command("git ls-files --others --ignored --exclude-standard")
-    ignored_files = stdout.strip().split('\n') if stdout.strip() else []
+    # Check for dangerous files in a single walk of the tree
+    for root, dirs, files in os.walk("."):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            file = os.path.join(root, name)
+            if not (DANGEROUS_FILE_RE.match(name) or DANGEROUS_FILE_RE.match(file[2:])):
+                continue
+            if not file.endswith('credentials.encrypted'):  # Encrypted files are OK
+                violations.append(f"Dangerous file found: {file}")
     
     if violations:
         print("❌ DANGEROUS FILES FOUND:")
@@ -144,31 +410,29 @@ def scan_current_files():
         print("✅ No dangerous files found")
         return True
 
+REQUIRED_GITIGNORE_PATTERNS = (
+    "# Sensitive credential files",
+    "config/secrets.yaml",
+    "config/credentials.yaml",
+    "config/auth_config.yaml",
+    ".env*",
+    "!.env.example",
+    "*.key",
+    "*.token",
+    "*.json",
+    "tokens/",
+)
+
 def check_gitignore():
     """Check if .gitignore properly covers sensitive files"""
     print("\n🔍 Checking .gitignore coverage...")
     
-    required_patterns = [
-        "# Sensitive credential files",
-        "config/secrets.yaml",
-        "config/credentials.yaml",
-        "config/auth_config.yaml",
-        ".env*",
-        "!.env.example",
-        "*.key",
-        "*.token",
-        "*.json",
-        "tokens/",
-    ]
-    
     try:
-        with open('.gitignore', 'r') as f:
-            gitignore_content = f.read()
+        gitignore_content = Path('.gitignore').read_text()
         
-        missing_patterns = []
-        for pattern in required_patterns:
-            if pattern not in gitignore_content:
-                missing_patterns.append(pattern)
+        # Compare whole lines as a set; kept in declaration order for output
+        actual_patterns = {line.strip() for line in gitignore_content.splitlines() if line.strip()}
+        missing_patterns = [pattern for pattern in REQUIRED_GITIGNORE_PATTERNS if pattern not in actual_patterns]
         
         if missing_patterns:
             print("⚠️  Missing .gitignore patterns:")
@@ -216,15 +480,23 @@ def verify_encryption():
         print(f"❌ Encryption verification failed: {e}")
         return False
 
-def main():
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Scan the repository for credential leaks")
+    parser.add_argument("--since", help="Only scan history newer than this git date, e.g. '2.years'")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main security scan"""
+    args = parse_args(argv)
+    
     print("🛡️  Git Repository Security Scanner")
     print("=" * 50)
     print("Scanning repository before GitHub upload...")
     print()
     
     checks = [
-        ("Git History", scan_git_history),
+        ("Git History", lambda: scan_git_history(since=args.since)),
         ("Current Files", scan_current_files), 
         (".gitignore", check_gitignore),
         ("Encryption", verify_encryption),
@@ -15,6 +15,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from utils.encryption import credential_manager
 
+# Decrypted credentials for this menu session; cleared whenever they change
+_cache = {"creds": None}
+
+
+def cached_get_credentials():
+    """Return decrypted credentials, decrypting at most once until invalidated"""
+    if _cache["creds"] is None:
+        _cache["creds"] = credential_manager.get_credentials()
+    return _cache["creds"]
+
 
 def main():
     """Main credential setup function"""
@@ -64,7 +74,7 @@ def main():
 def show_credential_status():
     """Show which credentials are configured"""
     try:
-        credentials = credential_manager.get_credentials()
+        credentials = cached_get_credentials()
         if credentials:
             print("\n📋 Configured credentials:")
             
@@ -124,6 +134,7 @@ def update_credential():
             return
         
         if credential_manager.update_credential(field_key, new_value):
+            _cache["creds"] = None
             print(f"✅ {display_name} updated successfully")
         else:
             print(f"❌ Failed to update {display_name}")
@@ -145,6 +156,7 @@ def reset_credentials():
         
         if confirm == 'yes':
             if credential_manager.reset_credentials():
+                _cache["creds"] = None
                 print("✅ All credentials reset successfully")
                 
                 setup_new = input("\nWould you like to set up new credentials now? (y/n): ").strip().lower()
@@ -5,11 +5,17 @@ Git Security Setup Script
 Installs security hooks and configurations to prevent credential leaks.
 """
 
+import contextlib
+import io
 import os
 import subprocess
 import shutil
+import sys
 from pathlib import Path
 
+# Make the sibling security_scan module importable
+sys.path.insert(0, str(Path(__file__).parent))
+
 def setup_git_hooks():
     """Set up Git hooks for security"""
     print("🔒 Setting up Git security hooks...")
@@ -33,18 +39,34 @@ def setup_git_hooks():
     
     return True
 
+# Settings applied to the local repository config (keys as `git config --list` prints them)
+GIT_SETTINGS = {
+    "core.hookspath": ".githooks",  # Always use the hooks
+    "core.autocrlf": "input",
+    "core.filemode": "true",
+}
+
 def configure_git_settings():
     """Configure Git settings for security"""
     print("🔧 Configuring Git security settings...")
     
     try:
-        # Set up Git to always use the hooks
-        subprocess.run(["git", "config", "core.hooksPath", ".githooks"], check=True)
-        print("✅ Git hooks path configured")
+        # Read the current local config once and only write values that differ,
+        # so re-running setup spawns a single git process
+        result = subprocess.run(
+            ["git", "config", "--local", "--list", "-z"],
+            capture_output=True, text=True, check=True
+        )
+        current = {}
+        for entry in result.stdout.split("\0"):
+            key, _, value = entry.partition("\n")
+            current[key] = value
         
-        # Configure Git to be more secure
-        subprocess.run(["git", "config", "core.autocrlf", "input"], check=True)
-        subprocess.run(["git", "config", "core.fileMode", "true"], check=True)
+        for key, value in GIT_SETTINGS.items():
+            if current.get(key) != value:
+                subprocess.run(["git", "config", key, value], check=True)
+        
+        print("✅ Git hooks path configured")
         print("✅ Git security settings configured")
         
         return True
@@ -66,9 +88,11 @@ def test_security_setup():
             print(f"   Output: {result.stdout}")
             print(f"   Error: {result.stderr}")
         
-        # Test security scanner
-        result = subprocess.run(["python", "scripts/security_scan.py"], capture_output=True, text=True)
-        if "ALL SECURITY CHECKS PASSED" in result.stdout:
+        # Test security scanner in-process; its report is captured, not shown
+        import security_scan
+        with contextlib.redirect_stdout(io.StringIO()):
+            scan_result = security_scan.main([])
+        if scan_result == 0:
             print("✅ Security scanner working")
         else:
             print("⚠️  Security scanner test failed")
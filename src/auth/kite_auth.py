@@ -8,35 +8,106 @@ with token caching and minimal dependencies.
 import os
 import json
 import time
+import functools
+import base64
+import hashlib
+import hmac
 import logging
-import pyotp
-from typing import Optional
+import datetime
+from typing import Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
-from kiteconnect import KiteConnect
 
 from ..utils.config import config
-from ..utils.encryption import credential_manager
+from ..utils.encryption import get_credential_manager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# kiteconnect is imported where first needed; it pulls in heavy dependencies
+# that callers touching only this module's helpers don't need
+if TYPE_CHECKING:
+    from kiteconnect import KiteConnect
 
 logger = logging.getLogger(__name__)
 
+# Token file (de)serialization; orjson parses and encodes in C when installed.
+# The file is only ever machine-read, so it is written compact.
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(data) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode()
+
+# Every UTC offset is a multiple of 15 minutes, so the local date can only
+# change on a 900s boundary and is computed once per bucket
+DATE_BUCKET_SECONDS = 900
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def _epoch_day(date: datetime.date) -> int:
+    """Days since 1970-01-01 for a local date"""
+    return date.toordinal() - _EPOCH_ORDINAL
+
+
+@functools.lru_cache(maxsize=2)
+def _day_for_bucket(bucket: int) -> Tuple[int, str]:
+    """Local (epoch day, 'YYYY-MM-DD') for a DATE_BUCKET_SECONDS-aligned bucket"""
+    local = time.localtime(bucket * DATE_BUCKET_SECONDS)
+    date = datetime.date(local.tm_year, local.tm_mon, local.tm_mday)
+    return _epoch_day(date), date.isoformat()
+
+
+def _today() -> Tuple[int, str]:
+    """Today's local date as (epoch day, 'YYYY-MM-DD')"""
+    return _day_for_bucket(int(time.time()) // DATE_BUCKET_SECONDS)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_kite(api_key: str) -> "KiteConnect":
+    """Shared KiteConnect client per API key, so its HTTP session is built once"""
+    from kiteconnect import KiteConnect
+    return KiteConnect(api_key=api_key)
+
 
 class KiteAuthenticator:
     """
     Streamlined Kite Connect authentication with token management
     """
     
+    __slots__ = (
+        'config', 'kite', 'access_token', 'token_file',
+        '_cached_token_data', '_token_mtime_ns', '_token_blob', '_token_tmp_file',
+        '_verify_ttl', '_verified_at', '_verified_token',
+    )
+    
     def __init__(self):
         """Initialize authenticator"""
         self.config = config.kite
         self.kite = None
         self.access_token = None
         self.token_file = Path("data/processed/access_token.json")
+        self._cached_token_data = None  # Parsed token file, reused while still today's
+        self._token_mtime_ns = None  # Token file mtime the cached data was read from
+        
+        # Reused for every save; only the values change
+        self._token_blob = {'access_token': None, 'epoch_day': 0, 'date': None, 'timestamp': 0}
+        self._token_tmp_file = self.token_file.with_suffix('.tmp')
+        
+        # A successful profile() check is trusted for this long for the same token
+        self._verify_ttl = 60.0
+        self._verified_at = 0.0
+        self._verified_token = None
         
         # Create token directory if it doesn't exist
         self.token_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Check if credentials are configured
-        if not credential_manager.is_configured() and not self.config.api_key:
+        if not get_credential_manager().is_configured() and not self.config.api_key:
             logger.error("No credentials configured. Please run: python scripts/setup_credentials.py")
             raise ValueError("No credentials configured")
         
@@ -45,7 +116,7 @@ class KiteAuthenticator:
             logger.error("API key not found in configuration")
             raise ValueError("API key not configured")
             
-        self.kite = KiteConnect(api_key=self.config.api_key)
+        self.kite = _get_kite(self.config.api_key)
         
         logger.info("KiteAuthenticator initialized")
     
@@ -54,61 +125,107 @@ class KiteAuthenticator:
         Authenticate with Kite Connect API
         Returns True if successful, False otherwise
         """
-        try:
-            # Try to load existing token
-            if self._load_cached_token():
-                if self._verify_token():
-                    logger.info("Using cached access token")
-                    return True
-                else:
-                    logger.info("Cached token invalid, generating new token")
-            
-            # Generate new token
-            return self._generate_new_token()
-            
-        except Exception as e:
-            logger.error(f"Authentication failed: {e}")
-            return False
+        # Fast path: today's token, verified within the TTL - no disk or network
+        if self._is_token_current():
+            return True
+        
+        # Each step handles its own expected failures (file I/O, network)
+        # Try to load existing token
+        if self._load_cached_token():
+            if self._verify_token():
+                logger.info("Using cached access token")
+                return True
+            else:
+                logger.info("Cached token invalid, generating new token")
+        
+        # Generate new token
+        return self._generate_new_token()
+    
+    def _is_token_current(self) -> bool:
+        """True if the active token is today's and was verified within the TTL"""
+        token_data = self._cached_token_data
+        return (
+            self.access_token is not None
+            and self._verified_token == self.access_token
+            and time.monotonic() - self._verified_at < self._verify_ttl
+            and token_data is not None
+            and token_data.get('epoch_day') == _today()[0]
+        )
     
     def _load_cached_token(self) -> bool:
         """Load cached access token"""
-        try:
-            if not self.token_file.exists():
-                return False
-            
-            with open(self.token_file, 'r') as f:
-                token_data = json.load(f)
-            
-            # Check if token is from today (tokens expire daily)
-            token_date = token_data.get('date')
-            today = time.strftime('%Y-%m-%d')
-            
-            if token_date != today:
-                logger.debug("Token is from different day")
-                return False
-            
-            self.access_token = token_data.get('access_token')
-            self.kite.set_access_token(self.access_token)
-            
-            return True
-            
-        except Exception as e:
-            logger.debug(f"Failed to load cached token: {e}")
+        today, _ = _today()
+        
+        # Tokens rotate daily, so today's token is served from memory
+        token_data = self._cached_token_data
+        if token_data is None or token_data.get('epoch_day') != today:
+            # Otherwise only re-read the file if it changed on disk; with
+            # nothing cached the file is opened directly, no stat first
+            if token_data is None or self._get_token_mtime_ns() != self._token_mtime_ns:
+                # Only opening, reading and parsing the file can fail here;
+                # the mtime comes from the open handle so it matches the bytes
+                try:
+                    with open(self.token_file, 'rb') as f:
+                        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                        token_data = _json_loads(f.read())
+                    
+                    # Files written before epoch_day existed only carry the date
+                    if 'epoch_day' not in token_data and token_data.get('date'):
+                        token_data['epoch_day'] = _epoch_day(
+                            datetime.date.fromisoformat(token_data['date'])
+                        )
+                except FileNotFoundError:
+                    return False
+                except (OSError, ValueError) as e:
+                    logger.debug("Failed to load cached token: %s", e)
+                    return False
+                self._cached_token_data = token_data
+                self._token_mtime_ns = mtime_ns
+        
+        # Check if token is from today (tokens expire daily); the date string
+        # is kept in the file for humans, the check is an integer compare
+        if token_data.get('epoch_day') != today:
+            logger.debug("Token is from different day")
             return False
+        
+        self.access_token = token_data.get('access_token')
+        self.kite.set_access_token(self.access_token)
+        
+        return True
+    
+    def _get_token_mtime_ns(self) -> Optional[int]:
+        """Get modification time of the token file (None if missing)"""
+        try:
+            return os.stat(self.token_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
     
     def _verify_token(self) -> bool:
         """Verify if current token is valid"""
+        # Skip the network round trip if this token was verified recently
+        if (self._verified_token == self.access_token
+                and time.monotonic() - self._verified_at < self._verify_ttl):
+            return True
+        
+        # Already imported alongside KiteConnect in __init__
+        from kiteconnect.exceptions import KiteException
+        from requests import RequestException
+        
+        # Make a simple API call to verify token; only the call itself can fail
         try:
-            # Make a simple API call to verify token
             profile = self.kite.profile()
-            if profile and profile.get('user_id'):
-                logger.debug("Token verification successful")
-                return True
-            return False
-            
-        except Exception as e:
-            logger.debug(f"Token verification failed: {e}")
+        except (RequestException, KiteException) as e:
+            logger.debug("Token verification failed: %s", e)
+            self._verified_at = 0.0
             return False
+        
+        if profile and profile.get('user_id'):
+            logger.debug("Token verification successful")
+            self._verified_at = time.monotonic()
+            self._verified_token = self.access_token
+            return True
+        self._verified_at = 0.0
+        return False
     
     def _generate_new_token(self) -> bool:
         """Generate new access token using credentials"""
@@ -152,21 +269,24 @@ class KiteAuthenticator:
     def _save_token(self):
         """Save access token to cache file"""
         try:
-            token_data = {
-                'access_token': self.access_token,
-                'date': time.strftime('%Y-%m-%d'),
-                'timestamp': int(time.time())
-            }
+            token_data = self._token_blob
+            token_data['access_token'] = self.access_token
+            token_data['epoch_day'], token_data['date'] = _today()
+            token_data['timestamp'] = int(time.time())
             
-            with open(self.token_file, 'w') as f:
-                json.dump(token_data, f, indent=2)
+            # Write a temp file and rename it over the cache so readers never
+            # see a partially written token, even if the process dies mid-write
+            self._token_tmp_file.write_bytes(_json_dumps(token_data))
+            os.replace(self._token_tmp_file, self.token_file)
+            self._cached_token_data = token_data
+            self._token_mtime_ns = self._get_token_mtime_ns()
             
             logger.debug("Access token saved to cache")
             
         except Exception as e:
             logger.error(f"Failed to save token: {e}")
     
-    def get_kite_instance(self) -> Optional[KiteConnect]:
+    def get_kite_instance(self) -> Optional["KiteConnect"]:
         """Get authenticated KiteConnect instance"""
         if self.access_token and self.kite:
             return self.kite
@@ -187,6 +307,10 @@ class KiteAuthenticator:
                 self.token_file.unlink()
             
             self.access_token = None
+            self._cached_token_data = None
+            self._token_mtime_ns = None
+            self._verified_at = 0.0
+            self._verified_token = None
             logger.info("Logged out successfully")
             
         except Exception as e:
@@ -198,18 +322,57 @@ class TOTPGenerator:
     TOTP (Time-based One-Time Password) generator for 2FA
     """
     
+    # RFC 6238 parameters, matching pyotp's defaults
+    INTERVAL = 30
+    DIGITS = 6
+    
+    __slots__ = ('secret', '_key', '_last_counter', '_last_otp')
+    
     def __init__(self, secret: str):
         """Initialize TOTP generator"""
         self.secret = secret
-        self.totp = pyotp.TOTP(secret)
+        
+        # Decode the base32 secret once; every OTP is one HMAC over this key
+        padding = '=' * (-len(secret) % 8)
+        self._key = base64.b32decode(secret + padding, casefold=True)
+        
+        # The code is constant within an interval, so the last one is reused
+        self._last_counter = -1
+        self._last_otp = ''
+    
+    def _otp_for(self, counter: int) -> str:
+        """HOTP value for a time-step counter (RFC 4226 dynamic truncation)"""
+        digest = hmac.new(self._key, counter.to_bytes(8, 'big'), hashlib.sha1).digest()
+        offset = digest[-1] & 0x0F
+        code = int.from_bytes(digest[offset:offset + 4], 'big') & 0x7FFFFFFF
+        return str(code % 10 ** self.DIGITS).zfill(self.DIGITS)
     
     def get_current_otp(self) -> str:
         """Get current OTP"""
-        return self.totp.now()
+        counter = int(time.time()) // self.INTERVAL
+        if counter != self._last_counter:
+            self._last_otp = self._otp_for(counter)
+            self._last_counter = counter
+        return self._last_otp
     
-    def verify_otp(self, token: str) -> bool:
-        """Verify OTP token"""
-        return self.totp.verify(token)
+    def verify_otp(self, token: str, valid_window: int = 1) -> bool:
+        """
+        Verify OTP token
+        
+        Args:
+            token: OTP to check
+            valid_window: Adjacent intervals also accepted, to allow for clock skew
+        """
+        token = str(token)
+        if hmac.compare_digest(token, self.get_current_otp()):
+            return True
+        
+        counter = self._last_counter
+        for offset in range(1, valid_window + 1):
+            if (hmac.compare_digest(token, self._otp_for(counter - offset))
+                    or hmac.compare_digest(token, self._otp_for(counter + offset))):
+                return True
+        return False
 
 
 # Enhanced authentication flow for production use
@@ -234,15 +397,14 @@ class ProductionAuthFlow:
             request_token: Request token from Kite login flow
         """
         try:
-            kite = KiteConnect(api_key=self.config.api_key)
-            
-            # Generate access token
+            # Generate access token on the authenticator's existing client
+            kite = self.authenticator.kite
             data = kite.generate_session(request_token, api_secret=self.config.api_secret)
             access_token = data["access_token"]
             
             # Set token in authenticator
             self.authenticator.access_token = access_token
-            self.authenticator.kite.set_access_token(access_token)
+            kite.set_access_token(access_token)
             
             # Save token
             self.authenticator._save_token()
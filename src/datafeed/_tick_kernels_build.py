@@ -0,0 +1,32 @@
+"""
+Ahead-of-time Build for Tick Kernels
+
+Compiles the kernels in tick_kernels.py into the ``_tick_kernels``
+extension module with numba.pycc, so trading starts without JIT warmup.
+
+Usage (from the project root):
+    python -m src.datafeed._tick_kernels_build
+"""
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+from .tick_kernels import (
+    _tick_action, TICK_ACTION_SIGNATURE, _ingest_ticks, INGEST_TICKS_SIGNATURE,
+    _ingest_batch, INGEST_BATCH_SIGNATURE, _aggregate_ticks, AGGREGATE_TICKS_SIGNATURE,
+    _record_ticks, RECORD_TICKS_SIGNATURE
+)
+
+cc = CC('_tick_kernels')
+cc.output_dir = str(Path(__file__).parent)
+
+cc.export('tick_action', TICK_ACTION_SIGNATURE)(_tick_action)
+cc.export('ingest_ticks', INGEST_TICKS_SIGNATURE)(_ingest_ticks)
+cc.export('ingest_batch', INGEST_BATCH_SIGNATURE)(_ingest_batch)
+cc.export('aggregate_ticks', AGGREGATE_TICKS_SIGNATURE)(_aggregate_ticks)
+cc.export('record_ticks', RECORD_TICKS_SIGNATURE)(_record_ticks)
+
+
+if __name__ == "__main__":
+    cc.compile()
\ No newline at end of file
@@ -5,22 +5,133 @@ Optimized WebSocket-based data feed with connection pooling,
 automatic reconnection, and efficient tick processing.
 """
 
+import os
 import asyncio
+import heapq
 import threading
 import time
 import logging
-import queue
-from typing import Dict, List, Set, Optional, Callable, Any
-from collections import defaultdict
+import struct
+from typing import Dict, List, Set, Tuple, Optional, Callable, Any
 from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 from kiteconnect import KiteTicker
+from twisted.internet import reactor
 from ..utils.config import config
-from .tick_data import TickData, RingBuffer, TickStorage, TickAggregator, PerformanceMonitor
+from .tick_data import (
+    TickData, TICK_DTYPE, RingBuffer, SPSCTickRing, TickStorage, TickAggregator,
+    PerformanceMonitor
+)
 
 logger = logging.getLogger(__name__)
 
+# Subscription modes, in KiteTicker's naming
+MODES = ('ltp', 'quote', 'full')
+
+# Wall clock in integer ns (no float multiply/truncate per batch)
+_now_ns = time.time_ns
+
+# How long the tick processor sleeps when the tick ring is empty
+IDLE_POLL_SECONDS = 50e-6
+
+# After this many empty polls (~10 ms) the processor stops polling and blocks
+# until the producer signals new ticks, waking at least every IDLE_WAIT_SECONDS
+IDLE_SPIN_POLLS = 200
+IDLE_WAIT_SECONDS = 0.1
+
+# Empty depth level for ticks without market depth
+_NO_DEPTH = {'price': 0.0, 'quantity': 0}
+
+# Kite binary packet layouts (big-endian), as decoded by KiteTicker._parse_binary
+_UINT16 = struct.Struct('>H')
+_UINT32 = struct.Struct('>I')
+_LTP_PACKET = struct.Struct('>II')  # token, last price
+_INDEX_PACKET = struct.Struct('>IIIIII')  # token, last price, high, low, open, close
+_QUOTE_PACKET = struct.Struct('>IIIIIIIIIII')  # token, last price, last qty, avg price,
+                                               # volume, buy qty, sell qty, open, high, low, close
+_FULL_EXTRA = struct.Struct('>IIIII')  # last trade time, oi, oi high, oi low, exchange time
+_DEPTH_LEVEL = struct.Struct('>II')  # quantity, price
+
+# Prices are sent as integers; the divisor depends on the token's segment
+_PRICE_DIVISORS = {
+    KiteTicker.EXCHANGE_MAP['cds']: 10000000.0,
+    KiteTicker.EXCHANGE_MAP['bcd']: 10000.0,
+    KiteTicker.EXCHANGE_MAP['nco']: 10000.0,
+}
+
+
+class FastKiteTicker(KiteTicker):
+    """
+    KiteTicker that decodes binary messages straight into TICK_DTYPE arrays
+    
+    on_ticks receives one TICK_DTYPE array per message instead of a list of
+    tick dicts, so no per-tick dicts (nor nested ohlc/depth dicts) are built.
+    volume is the last traded quantity, change_percent the percentage change
+    from the previous close, and bid/ask come from the best depth level.
+    
+    The array is a view of a buffer owned by the ticker and reused for the
+    next message, so on_ticks must copy whatever it keeps (DataFeedService
+    copies it into the tick ring before returning).
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._batch_buffer = np.empty(64, dtype=TICK_DTYPE, order='C')  # Grows to the largest message
+    
+    def _parse_binary(self, bin):
+        """Parse binary data into a TICK_DTYPE array (one row per packet)"""
+        rows = []
+        if len(bin) >= 2:
+            offset = 2
+            for _ in range(_UINT16.unpack_from(bin, 0)[0]):
+                length = _UINT16.unpack_from(bin, offset)[0]
+                start = offset + 2
+                offset = start + length
+                
+                exchange_timestamp = oi = bid_qty = ask_qty = 0
+                bid_price = ask_price = 0.0
+                
+                if length == 8:
+                    token, last_price = _LTP_PACKET.unpack_from(bin, start)
+                    volume = open_price = high_price = low_price = close_price = 0
+                elif length == 28 or length == 32:
+                    (token, last_price, high_price, low_price,
+                     open_price, close_price) = _INDEX_PACKET.unpack_from(bin, start)
+                    volume = 0
+                    if length == 32:
+                        exchange_timestamp = _UINT32.unpack_from(bin, start + 28)[0] * 1000
+                elif length == 44 or length == 184:
+                    (token, last_price, volume, _, _, _, _, open_price, high_price,
+                     low_price, close_price) = _QUOTE_PACKET.unpack_from(bin, start)
+                    if length == 184:
+                        _, oi, _, _, exchange_timestamp = _FULL_EXTRA.unpack_from(bin, start + 44)
+                        exchange_timestamp *= 1000
+                        bid_qty, bid_price = _DEPTH_LEVEL.unpack_from(bin, start + 64)
+                        ask_qty, ask_price = _DEPTH_LEVEL.unpack_from(bin, start + 124)
+                else:
+                    continue
+                
+                divisor = _PRICE_DIVISORS.get(token & 0xff, 100.0)
+                last_price /= divisor
+                close_price /= divisor
+                change = last_price - close_price if close_price else 0.0
+                
+                rows.append((  # TICK_DTYPE field order
+                    0, exchange_timestamp, token, last_price, volume,
+                    open_price / divisor, high_price / divisor, low_price / divisor, close_price,
+                    change, change * 100 / close_price if close_price else 0.0,
+                    bid_price / divisor, ask_price / divisor, bid_qty, ask_qty, oi
+                ))
+        
+        if len(rows) > len(self._batch_buffer):
+            self._batch_buffer = np.empty(max(len(rows), 2 * len(self._batch_buffer)),
+                                          dtype=TICK_DTYPE, order='C')
+        batch = self._batch_buffer[:len(rows)]
+        batch[:] = rows
+        batch['timestamp'] = _now_ns() // 1_000_000  # Receive time in ms, shared by the batch
+        return batch
+
 
 class ConnectionPool:
     """
@@ -36,23 +147,41 @@ class ConnectionPool:
         self.connection_assignments = {}  # instrument_token -> connection_index
         self.instrument_counts = [0] * max_connections  # Track instruments per connection
         self.lock = threading.RLock()
+        self.active_connections = 0  # Connections currently marked connected
+        
+        # Min-heap of [instrument count, connection index]; ties go to the lowest index
+        self._load_heap = [[0, i] for i in range(max_connections)]
+        heapq.heapify(self._load_heap)
         
         # Create connections
         for i in range(max_connections):
-            ticker = KiteTicker(api_key, access_token)
+            ticker = FastKiteTicker(api_key, access_token)
             self.connections.append({
                 'ticker': ticker,
                 'instruments': set(),
+                'modes': {mode: set() for mode in MODES},  # mode -> instrument tokens
+                'mode_dirty': {mode: set() for mode in MODES},  # not yet sent to the ticker
+                'mode_map': {  # mode -> ticker mode constant
+                    'ltp': ticker.MODE_LTP,
+                    'quote': ticker.MODE_QUOTE,
+                    'full': ticker.MODE_FULL,
+                },
+                'removed': set(),  # unsubscribed, not yet sent to the ticker
                 'connected': False,
                 'reconnect_count': 0
             })
+        
+        # The set of connections is fixed once created; share one immutable view
+        self._connections_tuple = tuple(self.connections)
     
     def assign_instrument(self, instrument_token: int) -> int:
         """Assign instrument to least loaded connection"""
         with self.lock:
-            # Find connection with minimum instruments
-            min_count = min(self.instrument_counts)
-            connection_index = self.instrument_counts.index(min_count)
+            # Least loaded connection is at the top of the heap
+            entry = self._load_heap[0]
+            connection_index = entry[1]
+            entry[0] += 1
+            heapq.heapreplace(self._load_heap, entry)
             
             # Assign instrument
             self.connection_assignments[instrument_token] = connection_index
@@ -64,23 +193,34 @@ class ConnectionPool:
     def remove_instrument(self, instrument_token: int):
         """Remove instrument from its assigned connection"""
         with self.lock:
-            if instrument_token in self.connection_assignments:
-                connection_index = self.connection_assignments[instrument_token]
+            # One lookup that also removes the assignment
+            connection_index = self.connection_assignments.pop(instrument_token, None)
+            if connection_index is not None:
                 self.connections[connection_index]['instruments'].discard(instrument_token)
                 self.instrument_counts[connection_index] -= 1
-                del self.connection_assignments[instrument_token]
+                
+                # Removals are rare; rebuild the heap from the counts
+                self._load_heap = [[count, i] for i, count in enumerate(self.instrument_counts)]
+                heapq.heapify(self._load_heap)
     
     def get_connection(self, instrument_token: int) -> Optional[Dict]:
         """Get connection for specific instrument"""
         with self.lock:
-            if instrument_token in self.connection_assignments:
-                connection_index = self.connection_assignments[instrument_token]
+            connection_index = self.connection_assignments.get(instrument_token)
+            if connection_index is not None:
                 return self.connections[connection_index]
         return None
     
-    def get_all_connections(self) -> List[Dict]:
-        """Get all connections"""
-        return self.connections.copy()
+    def set_connected(self, connection: Dict, connected: bool):
+        """Update a connection's state, counting only real transitions"""
+        with self.lock:
+            if connection['connected'] != connected:
+                connection['connected'] = connected
+                self.active_connections += 1 if connected else -1
+    
+    def get_all_connections(self) -> Tuple[Dict, ...]:
+        """Get all connections (shared tuple, no copy per call)"""
+        return self._connections_tuple
 
 
 class DataFeedService:
@@ -104,18 +244,35 @@ class DataFeedService:
         # Data structures
         self.ring_buffer = RingBuffer(self.config.performance.ring_buffer_size)
         self.tick_storage = None
-        self.tick_aggregator = TickAggregator(self.config.performance.tick_aggregation_interval)
+        self.tick_aggregator = TickAggregator(self.config.performance.tick_aggregation_interval,
+                                              self.config.performance.bar_history_size)
         self.performance_monitor = PerformanceMonitor()
         
         # Subscription management
         self.subscribed_instruments = set()
-        self.instrument_modes = {}  # instrument_token -> mode
+        self.instrument_modes = {}  # instrument_token -> mode (only while modes are mixed)
+        self._uniform_mode = None  # Mode shared by every subscribed instrument, if any
         self.tick_callbacks = []  # List of callback functions
+        self.tick_batch_callbacks = []  # List of batch callback functions
+        
+        # Pre-allocated SoA buffers for batch callbacks
+        self.tick_batch_size = self.config.performance.tick_batch_size
+        self.batch_tokens = np.empty(self.tick_batch_size, dtype=np.int64)
+        self.batch_prices = np.empty(self.tick_batch_size, dtype=np.float32)
+        self.batch_changes = np.empty(self.tick_batch_size, dtype=np.float32)
+        self.batch_count = 0
+        self.batch_window_ns = self.config.performance.tick_batch_window_us * 1000
+        self.batch_deadline_ns = 0  # Flush deadline of the pending batch
         
         # Threading
         self.running = False
+        self.processor_thread = None  # Sole consumer of tick_ring and storage_chunk
+        self.websocket_pinned = False  # Reactor thread pinned (on first connect)
         self.worker_pool = ThreadPoolExecutor(max_workers=self.config.performance.worker_threads)
-        self.tick_queue = queue.Queue(maxsize=self.config.performance.buffer_size)
+        self.tick_ring = SPSCTickRing(self.config.performance.buffer_size)
+        self.tick_ready = threading.Event()  # Set by the producer while the processor waits
+        self.processor_waiting = False
+        self.drain_buffer = np.empty(self.tick_batch_size, dtype=TICK_DTYPE, order='C')
         
         # Statistics
         self.stats = {
@@ -131,12 +288,54 @@ class DataFeedService:
             storage_path = f"data/processed/ticks_{int(time.time())}.bin"
             self.tick_storage = TickStorage(storage_path, self.config.performance.mmap_size)
         
+        # Ticks are written to storage in chunks, one worker task per chunk
+        self.storage_chunk_size = self.config.datafeed.tick_storage_chunk_size
+        self.storage_chunk = np.empty(self.storage_chunk_size, dtype=TICK_DTYPE, order='C')
+        self.storage_count = 0
+        self.storage_offset = 0  # Next write position in the storage file
+        self.storage_flush_ns = self.config.datafeed.tick_storage_flush_ms * 1_000_000
+        self.storage_deadline_ns = 0  # Flush deadline of the pending chunk
+        
         logger.info("DataFeed service initialized")
     
-    def add_tick_callback(self, callback: Callable[[TickData], None]):
-        """Add callback function to be called on each tick"""
+    def add_tick_callback(self, callback: Callable[[np.ndarray], None]):
+        """
+        Add callback function to be called with each processed batch of ticks
+        
+        The callback receives a TICK_DTYPE array (read-only by convention, it is
+        shared by all tick callbacks) and runs on the worker pool, so it may
+        keep the array. Use add_tick_callback_single for per-tick TickData.
+        """
         self.tick_callbacks.append(callback)
     
+    def add_tick_callback_single(self, callback: Callable[[TickData], None]):
+        """
+        Add callback function to be called on each tick
+        
+        Compatibility wrapper over add_tick_callback: rows are converted to
+        TickData one by one, so the callback pays the per-tick cost itself.
+        """
+        def run_per_tick(ticks: np.ndarray):
+            for tick in TickData.from_records(ticks):
+                try:
+                    callback(tick)
+                except Exception as e:
+                    logger.error(f"Error in tick callback for {tick.instrument_token}: {e}")
+        
+        self.add_tick_callback(run_per_tick)
+    
+    def add_tick_batch_callback(self, callback: Callable[[np.ndarray, np.ndarray, np.ndarray], None]):
+        """
+        Add callback function to be called with batches of ticks
+        
+        The callback receives (instrument_tokens, last_prices, change_percents)
+        as NumPy arrays, at most performance.tick_batch_size ticks that arrived
+        within performance.tick_batch_window_us. It runs on the tick processing
+        thread and the arrays are reused once it returns, so copy any data that
+        must outlive the call.
+        """
+        self.tick_batch_callbacks.append(callback)
+    
     def subscribe(self, instruments: List[int], mode: str = "quote") -> bool:
         """
         Subscribe to instruments with specified mode
@@ -147,7 +346,7 @@ class DataFeedService:
         """
         try:
             # Validate mode
-            if mode not in ['ltp', 'quote', 'full']:
+            if mode not in MODES:
                 raise ValueError(f"Invalid mode: {mode}. Must be 'ltp', 'quote', or 'full'")
             
             # Check total instrument limit
@@ -160,13 +359,39 @@ class DataFeedService:
                 return False
             
             # Assign instruments to connections
-            for instrument_token in instruments:
-                if instrument_token not in self.subscribed_instruments:
-                    connection_index = self.connection_pool.assign_instrument(instrument_token)
-                    self.instrument_modes[instrument_token] = mode
-                    self.subscribed_instruments.add(instrument_token)
-                    
-                    logger.debug(f"Assigned instrument {instrument_token} to connection {connection_index}")
+            debug = logger.isEnabledFor(logging.DEBUG)
+            with self.connection_pool.lock:
+                # While all instruments share one mode it is kept once in
+                # _uniform_mode rather than written per instrument
+                if not self.subscribed_instruments:
+                    self.instrument_modes.clear()
+                    self._uniform_mode = mode
+                elif self._uniform_mode is not None and self._uniform_mode != mode:
+                    # Mixed modes: fall back to tracking each instrument's mode
+                    self.instrument_modes = dict.fromkeys(self.subscribed_instruments,
+                                                          self._uniform_mode)
+                    self._uniform_mode = None
+                instrument_modes = None if self._uniform_mode else self.instrument_modes
+                
+                for instrument_token in instruments:
+                    if instrument_token not in self.subscribed_instruments:
+                        connection_index = self.connection_pool.assign_instrument(instrument_token)
+                        if instrument_modes is not None:
+                            instrument_modes[instrument_token] = mode
+                        self.subscribed_instruments.add(instrument_token)
+                        
+                        # Record the change; _update_subscriptions sends only changes
+                        connection = self.connection_pool.connections[connection_index]
+                        connection['modes'][mode].add(instrument_token)
+                        connection['mode_dirty'][mode].add(instrument_token)
+                        connection['removed'].discard(instrument_token)
+                        
+                        if debug:
+                            logger.debug("Assigned instrument %d to connection %d",
+                                         instrument_token, connection_index)
+            
+            # Reserve dense bar rows so consumers can index bars by row
+            self.tick_aggregator.register_instruments(instruments)
             
             # Subscribe on each connection
             self._update_subscriptions()
@@ -181,11 +406,17 @@ class DataFeedService:
     def unsubscribe(self, instruments: List[int]) -> bool:
         """Unsubscribe from instruments"""
         try:
-            for instrument_token in instruments:
-                if instrument_token in self.subscribed_instruments:
-                    self.connection_pool.remove_instrument(instrument_token)
-                    self.subscribed_instruments.remove(instrument_token)
-                    del self.instrument_modes[instrument_token]
+            with self.connection_pool.lock:
+                for instrument_token in instruments:
+                    if instrument_token in self.subscribed_instruments:
+                        connection = self.connection_pool.get_connection(instrument_token)
+                        mode = self._uniform_mode or self.instrument_modes.pop(instrument_token)
+                        connection['modes'][mode].discard(instrument_token)
+                        connection['mode_dirty'][mode].discard(instrument_token)
+                        connection['removed'].add(instrument_token)
+                        
+                        self.connection_pool.remove_instrument(instrument_token)
+                        self.subscribed_instruments.remove(instrument_token)
             
             # Update subscriptions on connections
             self._update_subscriptions()
@@ -198,30 +429,46 @@ class DataFeedService:
             return False
     
     def _update_subscriptions(self):
-        """Update subscriptions on all connections"""
+        """Send pending subscription changes on all connections"""
         for i, connection in enumerate(self.connection_pool.get_all_connections()):
-            if connection['instruments'] and connection['connected']:
-                ticker = connection['ticker']
-                instruments = list(connection['instruments'])
-                
-                # Subscribe to instruments
-                ticker.subscribe(instruments)
-                
-                # Set modes
-                mode_groups = defaultdict(list)
-                for instrument_token in instruments:
-                    mode = self.instrument_modes.get(instrument_token, 'quote')
-                    mode_groups[mode].append(instrument_token)
-                
-                for mode, tokens in mode_groups.items():
-                    if mode == 'ltp':
-                        ticker.set_mode(ticker.MODE_LTP, tokens)
-                    elif mode == 'quote':
-                        ticker.set_mode(ticker.MODE_QUOTE, tokens)
-                    elif mode == 'full':
-                        ticker.set_mode(ticker.MODE_FULL, tokens)
-                
-                logger.debug(f"Updated subscriptions for connection {i}: {len(instruments)} instruments")
+            self._sync_connection(connection, i)
+    
+    def _sync_connection(self, connection: Dict, connection_index: int, resync: bool = False):
+        """
+        Send a connection's subscription changes to its ticker
+        
+        Only instruments added or removed since the last sync are sent, so
+        this costs O(changes) rather than O(subscribed instruments). With
+        resync, every subscribed instrument is sent (after connecting).
+        Changes made while disconnected stay pending until then.
+        """
+        with self.connection_pool.lock:
+            if not connection['connected']:
+                return
+            
+            ticker = connection['ticker']
+            
+            # Unsubscribe removed instruments
+            removed = connection['removed']
+            if removed:
+                ticker.unsubscribe(list(removed))
+                removed.clear()
+            
+            # Subscribe and set mode per mode group
+            mode_map = connection['mode_map']
+            sent = 0
+            for mode, dirty in connection['mode_dirty'].items():
+                tokens = connection['modes'][mode] if resync else dirty
+                if tokens:
+                    tokens = list(tokens)
+                    ticker.subscribe(tokens)
+                    ticker.set_mode(mode_map[mode], tokens)
+                    sent += len(tokens)
+                dirty.clear()
+            
+            if sent:
+                logger.debug("Updated subscriptions for connection %d: %d instruments",
+                             connection_index, sent)
     
     def start(self) -> bool:
         """Start the data feed service"""
@@ -229,15 +476,22 @@ class DataFeedService:
             self.running = True
             
             # Start tick processing thread
-            threading.Thread(target=self._tick_processor, daemon=True).start()
+            self.processor_thread = threading.Thread(target=self._tick_processor, daemon=True)
+            self.processor_thread.start()
             
             # Start performance monitoring
             threading.Thread(target=self._performance_monitor, daemon=True).start()
             
-            # Connect all WebSocket connections
+            # Connect all WebSocket connections; they share KiteTicker's reactor
+            # thread, so no thread per connection is needed
             for i, connection in enumerate(self.connection_pool.get_all_connections()):
                 self._setup_connection_callbacks(connection, i)
-                threading.Thread(target=self._connect_websocket, args=(connection, i), daemon=True).start()
+                if i == 0 and not reactor.running:
+                    # Starts the reactor thread
+                    self._connect_websocket(connection, i)
+                else:
+                    # Twisted is not thread-safe; connect on the reactor thread
+                    reactor.callFromThread(self._connect_websocket, connection, i)
             
             logger.info("DataFeed service started")
             return True
@@ -256,6 +510,16 @@ class DataFeedService:
                 if connection['connected']:
                     connection['ticker'].close()
             
+            # Let the processor finish its current batch; after this the storage
+            # chunk has no other writer
+            if self.processor_thread:
+                self.processor_thread.join()
+                self.processor_thread = None
+            
+            # Submit the partial storage chunk before the workers stop
+            if self.tick_storage and self.storage_count:
+                self._flush_storage_chunk()
+            
             # Shutdown worker pool
             self.worker_pool.shutdown(wait=True)
             
@@ -274,45 +538,41 @@ class DataFeedService:
         
         def on_ticks(ws, ticks):
             """Handle incoming ticks"""
-            for tick_data in ticks:
-                try:
-                    # Convert to optimized TickData structure
-                    tick = TickData(
-                        instrument_token=tick_data.get('instrument_token', 0),
-                        timestamp=int(time.time() * 1000),  # Current timestamp in ms
-                        last_price=tick_data.get('last_price', 0.0),
-                        volume=tick_data.get('volume', 0),
-                        open_price=tick_data.get('ohlc', {}).get('open', 0.0),
-                        high_price=tick_data.get('ohlc', {}).get('high', 0.0),
-                        low_price=tick_data.get('ohlc', {}).get('low', 0.0),
-                        prev_close=tick_data.get('ohlc', {}).get('close', 0.0),
-                        change=tick_data.get('change', 0.0),
-                        change_percent=tick_data.get('change_percent', 0.0),
-                        exchange_timestamp=tick_data.get('exchange_timestamp', 0)
-                    )
+            try:
+                # FastKiteTicker already delivers one TICK_DTYPE batch per message
+                if isinstance(ticks, np.ndarray):
+                    batch = ticks
+                else:
+                    batch = self._build_tick_batch(ticks)
+                
+                # Hand batch to the processor
+                written = self.tick_ring.push(batch)
+                if self.processor_waiting:
+                    self.tick_ready.set()
+                if written < len(batch):
+                    logger.warning(f"Tick ring full, dropping {len(batch) - written} ticks")
                     
-                    # Queue tick for processing
-                    if not self.tick_queue.full():
-                        self.tick_queue.put((tick, connection_index))
-                    else:
-                        logger.warning("Tick queue full, dropping tick")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing tick: {e}")
+            except Exception as e:
+                logger.error(f"Error processing ticks: {e}")
         
         def on_connect(ws, response):
             """Handle connection established"""
-            connection['connected'] = True
+            # Callbacks run on the reactor thread that feeds the tick ring
+            if not self.websocket_pinned:
+                self.websocket_pinned = True
+                self._pin_thread('websocket')
+            
+            self.connection_pool.set_connected(connection, True)
             connection['reconnect_count'] = 0
             logger.info(f"Connection {connection_index} established")
             
             # Subscribe to assigned instruments
             if connection['instruments']:
-                self._update_subscriptions()
+                self._sync_connection(connection, connection_index, resync=True)
         
         def on_close(ws, code, reason):
             """Handle connection closed"""
-            connection['connected'] = False
+            self.connection_pool.set_connected(connection, False)
             logger.warning(f"Connection {connection_index} closed: {code} - {reason}")
         
         def on_error(ws, code, reason):
@@ -326,7 +586,7 @@ class DataFeedService:
         
         def on_noreconnect(ws):
             """Handle failed reconnection"""
-            connection['connected'] = False
+            self.connection_pool.set_connected(connection, False)
             logger.error(f"Connection {connection_index} failed to reconnect")
         
         # Assign callbacks
@@ -337,87 +597,289 @@ class DataFeedService:
         ticker.on_reconnect = on_reconnect
         ticker.on_noreconnect = on_noreconnect
     
+    @staticmethod
+    def _build_tick_batch(ticks: List[Dict]) -> np.ndarray:
+        """
+        Convert KiteTicker tick dicts into a TICK_DTYPE array
+        
+        Fallback for plain KiteTicker instances; fields match FastKiteTicker.
+        """
+        rows = []
+        for tick in ticks:
+            ohlc = tick.get('ohlc') or {}
+            last_price = tick.get('last_price', 0.0)
+            close_price = ohlc.get('close', 0.0)
+            exchange_timestamp = tick.get('exchange_timestamp')  # datetime in full mode
+            depth = tick.get('depth')
+            bid = depth['buy'][0] if depth else _NO_DEPTH
+            ask = depth['sell'][0] if depth else _NO_DEPTH
+            rows.append((  # TICK_DTYPE field order
+                0,
+                int(exchange_timestamp.timestamp() * 1000) if exchange_timestamp else 0,
+                tick.get('instrument_token', 0),
+                last_price,
+                tick.get('last_traded_quantity', 0),
+                ohlc.get('open', 0.0),
+                ohlc.get('high', 0.0),
+                ohlc.get('low', 0.0),
+                close_price,
+                last_price - close_price if close_price else 0.0,
+                tick.get('change', 0.0),  # KiteTicker's change is a percentage
+                bid['price'], ask['price'], bid['quantity'], ask['quantity'],
+                tick.get('oi', 0)
+            ))
+        
+        batch = np.empty(len(rows), dtype=TICK_DTYPE, order='C')
+        batch[:] = rows
+        batch['timestamp'] = _now_ns() // 1_000_000  # Receive time in ms, shared by the batch
+        return batch
+    
     def _connect_websocket(self, connection: Dict, connection_index: int):
-        """Connect WebSocket in separate thread"""
+        """Connect WebSocket (returns once the connection attempt is scheduled)"""
         try:
+            # KiteTicker runs on the shared Twisted reactor (epoll on Linux) with
+            # autobahn's TCP_NODELAY default, so asyncio loop policies
+            # (uvloop/io_uring) do not affect this transport. A native io_uring
+            # ticker would have to replace Twisted's TLS and WebSocket stack too;
+            # per-frame cost is dominated by parsing on the reactor thread, not
+            # by recv syscalls, and parsed ticks reach the processor through the
+            # SPSC tick ring without further copies
             ticker = connection['ticker']
             ticker.connect(threaded=True)
         except Exception as e:
             logger.error(f"Failed to connect WebSocket {connection_index}: {e}")
     
+    def _pin_thread(self, role: str):
+        """Pin the calling thread to the CPUs configured for its role"""
+        cpus = self.config.performance.cpu_affinity.get(role)
+        if not cpus or not hasattr(os, 'sched_setaffinity'):
+            return
+        
+        try:
+            os.sched_setaffinity(0, cpus)
+            logger.info(f"Pinned {role} thread to CPUs {cpus}")
+        except OSError as e:
+            logger.warning(f"Could not pin {role} thread to CPUs {cpus}: {e}")
+    
+    def _set_realtime_priority(self):
+        """Switch the calling thread to SCHED_FIFO if configured"""
+        priority = self.config.performance.realtime_priority
+        if not priority or not hasattr(os, 'sched_setscheduler'):
+            return
+        
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            logger.info(f"Tick processor running with SCHED_FIFO priority {priority}")
+        except OSError as e:
+            logger.warning(f"Could not set SCHED_FIFO priority {priority}: {e}")
+    
     def _tick_processor(self):
-        """Process ticks from queue in separate thread"""
+        """Process tick batches from the tick ring in separate thread"""
+        self._pin_thread('tick_processor')
+        self._set_realtime_priority()
+        
+        tick_ring = self.tick_ring
+        drain_buffer = self.drain_buffer
+        tick_ready = self.tick_ready
+        empty_polls = 0
+        
         while self.running:
             try:
-                # Get tick from queue with timeout
-                tick, connection_index = self.tick_queue.get(timeout=1.0)
+                # Drain whatever has arrived, up to one buffer
+                count = tick_ring.pop(drain_buffer)
+                if not count:
+                    # Batch window elapsed without filling the batch
+                    now_ns = time.monotonic_ns()
+                    if self.batch_count and now_ns >= self.batch_deadline_ns:
+                        self._flush_tick_batch()
+                    if self.storage_count and now_ns >= self.storage_deadline_ns:
+                        self._flush_storage_chunk()
+                    
+                    # Poll while ticks are flowing or a batch is due soon;
+                    # on an idle feed, block instead of waking every poll
+                    empty_polls += 1
+                    if empty_polls < IDLE_SPIN_POLLS or self.batch_count:
+                        time.sleep(IDLE_POLL_SECONDS)
+                        continue
+                    
+                    timeout = IDLE_WAIT_SECONDS
+                    if self.storage_count:
+                        timeout = min(timeout, max(self.storage_deadline_ns - now_ns, 0) / 1e9)
+                    tick_ready.clear()
+                    self.processor_waiting = True
+                    # Re-check after announcing the wait, so a push that
+                    # missed processor_waiting is not slept through
+                    if not len(tick_ring):
+                        tick_ready.wait(timeout)
+                    self.processor_waiting = False
+                    continue
                 
+                empty_polls = 0
+                
+                ticks = drain_buffer[:count]
                 start_time = time.time()
                 
-                # Process tick
-                self._process_tick(tick)
+                # Process batch
+                self._process_tick_batch(ticks)
                 
                 # Record performance
                 processing_time = time.time() - start_time
-                self.performance_monitor.record_tick(tick.instrument_token, processing_time)
+                self.performance_monitor.record_batch(ticks['instrument_token'], processing_time)
                 
                 # Update statistics
-                self.stats['total_ticks'] += 1
-                self.stats['last_tick_time'] = tick.timestamp
+                self.stats['total_ticks'] += len(ticks)
+                self.stats['last_tick_time'] = int(ticks['timestamp'][-1])
                 
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Error in tick processor: {e}")
     
-    def _process_tick(self, tick: TickData):
-        """Process individual tick"""
+    def _process_tick_batch(self, ticks: np.ndarray):
+        """Process a batch of ticks (TICK_DTYPE array)"""
         try:
-            # Add to ring buffer
-            self.ring_buffer.push(tick)
-            
-            # Store to file if enabled
+            # Add to ring buffer; with storage enabled the same pass also
+            # fills the storage chunk (one file write per chunk)
             if self.tick_storage:
-                tick_array = np.array([tick], dtype=self.ring_buffer.data.dtype)
-                self.worker_pool.submit(self.tick_storage.write_ticks, tick_array)
+                self._store_ticks(ticks)
+            else:
+                self.ring_buffer.push_batch(ticks)
             
             # Process aggregation
-            completed_bar = self.tick_aggregator.process_tick(tick)
-            if completed_bar:
-                logger.debug(f"Completed bar for {tick.instrument_token}: {completed_bar}")
+            completed_bars = self.tick_aggregator.process_batch(ticks)
+            if completed_bars and logger.isEnabledFor(logging.DEBUG):
+                for completed_bar in completed_bars:
+                    logger.debug("Completed bar for %d: %s",
+                                 completed_bar['instrument_token'], completed_bar)
             
-            # Call user callbacks
-            for callback in self.tick_callbacks:
-                try:
-                    self.worker_pool.submit(callback, tick)
-                except Exception as e:
-                    logger.error(f"Error in tick callback: {e}")
+            # Call user callbacks, one task per batch per callback; they run
+            # after the drain buffer is reused, so they share one copy
+            if self.tick_callbacks:
+                batch = ticks.copy()
+                for callback in self.tick_callbacks:
+                    try:
+                        self.worker_pool.submit(self._run_tick_callback, callback, batch)
+                    except Exception as e:
+                        logger.error(f"Error in tick callback: {e}")
+            
+            # Append to batch buffers for batch callbacks
+            if self.tick_batch_callbacks:
+                self._append_tick_batch(ticks)
                     
         except Exception as e:
-            logger.error(f"Error processing tick: {e}")
+            logger.error(f"Error processing ticks: {e}")
+    
+    def _store_ticks(self, ticks: np.ndarray):
+        """Push ticks to the ring buffer and the storage chunk, submitting each chunk once full"""
+        start = 0
+        total = len(ticks)
+        while start < total:
+            index = self.storage_count
+            if index == 0:
+                self.storage_deadline_ns = time.monotonic_ns() + self.storage_flush_ns
+            
+            if start == 0:
+                # One pass over the batch fills the ring buffer and the chunk
+                count = self.ring_buffer.push_batch_and_copy(ticks, self.storage_chunk, index)
+            else:
+                # Rows left over once the chunk filled up go into the next one
+                count = min(total - start, self.storage_chunk_size - index)
+                self.storage_chunk[index:index + count] = ticks[start:start + count]
+            self.storage_count = index + count
+            start += count
+            
+            # Flush when full or when the chunk has waited long enough
+            if (self.storage_count >= self.storage_chunk_size
+                    or time.monotonic_ns() >= self.storage_deadline_ns):
+                self._flush_storage_chunk()
+    
+    def _flush_storage_chunk(self):
+        """Submit the pending storage chunk for writing and start a fresh one"""
+        chunk = self.storage_chunk[:self.storage_count]
+        self.storage_chunk = np.empty(self.storage_chunk_size, dtype=TICK_DTYPE, order='C')
+        self.storage_count = 0
+        
+        # Chunks are appended; wrap to the start before one would not fit
+        if self.storage_offset + chunk.nbytes > self.tick_storage.max_size:
+            self.storage_offset = 0
+        self.worker_pool.submit(self.tick_storage.write_ticks, chunk, self.storage_offset)
+        self.storage_offset += chunk.nbytes
+    
+    def _append_tick_batch(self, ticks: np.ndarray):
+        """Copy ticks into the batch buffers, flushing whenever a batch completes"""
+        tokens = ticks['instrument_token']
+        prices = ticks['last_price']
+        changes = ticks['change_percent']
+        
+        start = 0
+        total = len(ticks)
+        while start < total:
+            index = self.batch_count
+            if index == 0:
+                self.batch_deadline_ns = time.monotonic_ns() + self.batch_window_ns
+            
+            # Column copies of as many ticks as fit in the pending batch
+            count = min(total - start, self.tick_batch_size - index)
+            end = index + count
+            self.batch_tokens[index:end] = tokens[start:start + count]
+            self.batch_prices[index:end] = prices[start:start + count]
+            self.batch_changes[index:end] = changes[start:start + count]
+            self.batch_count = end
+            start += count
+            
+            # Flush when full or when the batch window has elapsed
+            if (self.batch_count >= self.tick_batch_size
+                    or time.monotonic_ns() >= self.batch_deadline_ns):
+                self._flush_tick_batch()
+    
+    @staticmethod
+    def _run_tick_callback(callback: Callable[[np.ndarray], None], ticks: np.ndarray):
+        """Run a user tick callback, logging failures (callbacks need no handler of their own)"""
+        try:
+            callback(ticks)
+        except Exception as e:
+            logger.error(f"Error in tick callback ({len(ticks)} ticks, "
+                         f"instruments {np.unique(ticks['instrument_token']).tolist()}): {e}")
+    
+    def _flush_tick_batch(self):
+        """Deliver buffered ticks to batch callbacks"""
+        count = self.batch_count
+        self.batch_count = 0
+        
+        tokens = self.batch_tokens[:count]
+        prices = self.batch_prices[:count]
+        changes = self.batch_changes[:count]
+        
+        # One handler per batch; callbacks need no handler of their own
+        for callback in self.tick_batch_callbacks:
+            try:
+                callback(tokens, prices, changes)
+            except Exception as e:
+                logger.error(f"Error in tick batch callback ({count} ticks, "
+                             f"instruments {np.unique(tokens).tolist()}): {e}")
     
     def _performance_monitor(self):
         """Monitor performance metrics"""
-        last_time = time.time()
+        self._pin_thread('perf_monitor')
+        
+        last_time_ns = time.monotonic_ns()
         last_tick_count = 0
         
         while self.running:
             try:
                 time.sleep(self.config.logging.performance_interval)
                 
-                current_time = time.time()
+                current_time_ns = time.monotonic_ns()
                 current_tick_count = self.stats['total_ticks']
                 
-                # Calculate ticks per second
-                elapsed = current_time - last_time
+                # Calculate ticks per second (integer ns delta, immune to clock jumps)
+                elapsed_ns = current_time_ns - last_time_ns
                 tick_delta = current_tick_count - last_tick_count
                 
-                if elapsed > 0:
-                    self.stats['ticks_per_second'] = tick_delta / elapsed
+                if elapsed_ns > 0:
+                    self.stats['ticks_per_second'] = tick_delta * 1_000_000_000 / elapsed_ns
                 
                 # Update connection statistics
-                active_connections = sum(1 for conn in self.connection_pool.get_all_connections() 
-                                       if conn['connected'])
+                # Maintained by the connection callbacks, no scan needed
+                active_connections = self.connection_pool.active_connections
                 self.stats['active_connections'] = active_connections
                 self.stats['connected_instruments'] = len(self.subscribed_instruments)
                 
@@ -430,7 +892,7 @@ class DataFeedService:
                           f"{len(self.subscribed_instruments)} instruments, "
                           f"avg processing: {perf_stats.get('avg_processing_time', 0):.4f}ms")
                 
-                last_time = current_time
+                last_time_ns = current_time_ns
                 last_tick_count = current_tick_count
                 
             except Exception as e:
@@ -440,14 +902,28 @@ class DataFeedService:
         """Get latest ticks for instrument"""
         return self.ring_buffer.get_by_instrument(instrument_token, count)
     
-    def get_ohlc_bars(self, instrument_token: int, count: int = 100) -> List[Dict]:
-        """Get latest OHLC bars for instrument"""
+    def get_ohlc_bars(self, instrument_token: int, count: int = 100) -> np.ndarray:
+        """Get latest OHLC bars for instrument (BAR_DTYPE array, oldest first)"""
         return self.tick_aggregator.get_bars(instrument_token, count)
     
     def get_current_bar(self, instrument_token: int) -> Optional[Dict]:
         """Get current incomplete bar for instrument"""
         return self.tick_aggregator.get_current_bar(instrument_token)
     
+    def get_current_bar_row(self, instrument_token: int) -> Optional[int]:
+        """
+        Get the row of an instrument in the dense current-bar array
+        
+        Resolve the row once, then read bars_soa[row, BAR_CLOSE] etc.
+        directly instead of calling get_current_bar per tick.
+        """
+        return self.tick_aggregator.rows.get(instrument_token)
+    
+    @property
+    def bars_soa(self) -> np.ndarray:
+        """Dense current-bar array (rows: instruments, columns: BAR_* fields)"""
+        return self.tick_aggregator.bars
+    
     def get_statistics(self) -> Dict:
         """Get service statistics"""
         perf_stats = self.performance_monitor.get_stats()
@@ -455,7 +931,7 @@ class DataFeedService:
         return {
             **self.stats,
             'performance': perf_stats,
-            'queue_size': self.tick_queue.qsize(),
+            'queue_size': len(self.tick_ring),
             'buffer_usage': self.ring_buffer.count / self.ring_buffer.size,
             'subscribed_instruments': len(self.subscribed_instruments)
         }
\ No newline at end of file
@@ -8,18 +8,30 @@ using NumPy structured arrays and memory-mapped files.
 import numpy as np
 import mmap
 import os
-from typing import Dict, List, Optional, Tuple, NamedTuple
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple, NamedTuple
 from dataclasses import dataclass
 import threading
 import time
-from collections import defaultdict
+from collections import deque
 import logging
 
+from .tick_kernels import (
+    ingest_ticks, ingest_batch, aggregate_ticks, record_ticks,
+    BAR_OPEN, BAR_HIGH, BAR_LOW, BAR_CLOSE, BAR_VOLUME, BAR_TIMESTAMP, BAR_TICK_COUNT, BAR_FIELDS
+)
+
 logger = logging.getLogger(__name__)
 
 
 class TickData(NamedTuple):
-    """Optimized tick data structure"""
+    """
+    Optimized tick data structure
+    
+    As a NamedTuple this is already slotted: instances carry no __dict__
+    and fields are read through C-level tuple getters. Do not convert it
+    to a regular class; callers rely on it being immutable.
+    """
     instrument_token: int
     timestamp: int  # Unix timestamp in milliseconds
     last_price: float
@@ -31,12 +43,31 @@ class TickData(NamedTuple):
     change: float
     change_percent: float
     exchange_timestamp: int
+    
+    # The hot path passes TICK_DTYPE arrays around; these build TickData on
+    # demand for code that wants named tuples. Fields are picked by name
+    # (a multi-field index keeps the listed order), not by position.
+    
+    @classmethod
+    def from_record(cls, record: np.void) -> 'TickData':
+        """Build a TickData from one TICK_DTYPE row (e.g. ticks[i])"""
+        return cls._make(record[_TICK_DATA_FIELDS].item())
+    
+    @classmethod
+    def from_records(cls, ticks: np.ndarray) -> Iterator['TickData']:
+        """Lazily build TickData for each row of a TICK_DTYPE array"""
+        return map(cls._make, ticks[_TICK_DATA_FIELDS].tolist())
 
 
-# NumPy structured array dtype for tick data
+_TICK_DATA_FIELDS = list(TickData._fields)
+
+# NumPy structured array dtype for tick data. 8-byte fields come first and
+# the rest are 4 bytes, so with align=True every field is naturally aligned
+# and the 72-byte record needs no padding.
 TICK_DTYPE = np.dtype([
-    ('instrument_token', np.uint32),
     ('timestamp', np.uint64),
+    ('exchange_timestamp', np.uint64),
+    ('instrument_token', np.uint32),
     ('last_price', np.float32),
     ('volume', np.uint32),
     ('open_price', np.float32),
@@ -45,103 +76,333 @@ TICK_DTYPE = np.dtype([
     ('prev_close', np.float32),
     ('change', np.float32),
     ('change_percent', np.float32),
-    ('exchange_timestamp', np.uint64),
     ('bid_price', np.float32),
     ('ask_price', np.float32),
     ('bid_qty', np.uint32),
     ('ask_qty', np.uint32),
     ('oi', np.uint32),  # Open Interest
+], align=True)
+
+# NumPy structured array dtype for completed OHLCV bars
+BAR_DTYPE = np.dtype([
+    ('timestamp', np.uint64),  # Bar start, Unix timestamp in milliseconds
+    ('open', np.float32),
+    ('high', np.float32),
+    ('low', np.float32),
+    ('close', np.float32),
+    ('volume', np.uint64),
+    ('tick_count', np.uint32),
 ])
 
+_STRUCT_CODES = {'u4': 'I', 'u8': 'Q', 'f4': 'f', 'f8': 'd'}
+
+
+def _struct_for(dtype: np.dtype) -> struct.Struct:
+    """Build a struct matching a little-endian structured dtype, padding included"""
+    fmt = '<'
+    position = 0
+    for name in dtype.names:
+        field_dtype, offset = dtype.fields[name][:2]
+        fmt += 'x' * (offset - position) + _STRUCT_CODES[field_dtype.str[1:]]
+        position = offset + field_dtype.itemsize
+    return struct.Struct(fmt + 'x' * (dtype.itemsize - position))
+
+
+# Packs one tick row straight into TICK_DTYPE memory
+_TICK_ROW = _struct_for(TICK_DTYPE)
 
 class RingBuffer:
     """
     High-performance ring buffer for tick data using pre-allocated NumPy arrays
+    
+    There is one writer (the tick processor) and any number of readers, and
+    neither side locks the ring. Every tick written gets a number (tick n
+    lives in slot n % size). Before copying, the writer publishes the end of
+    the range it is about to write in reserved; afterwards it advances
+    written. Readers only use ticks below their snapshot of written, and
+    after gathering they drop any that the writer had started to overwrite
+    (those numbered below reserved - size). Plain int stores are atomic
+    under the GIL, so no other synchronization is needed.
     """
     
     def __init__(self, size: int):
         """Initialize ring buffer with given size"""
         self.size = size
-        self.data = np.zeros(size, dtype=TICK_DTYPE)
+        self.data = np.zeros(size, dtype=TICK_DTYPE, order='C')
+        self.rows = self.data.view(np.uint8).reshape(size, TICK_DTYPE.itemsize)  # Raw tick rows
+        self._memory = memoryview(self.data.view(np.uint8))  # Flat bytes for _TICK_ROW.pack_into
         self.head = 0
         self.tail = 0
         self.count = 0
-        self.lock = threading.RLock()
+        self.written = 0  # Ticks written since creation/clear (published after the copy)
+        self.reserved = 0  # written plus the ticks being copied (published before the copy)
+        
+        # Per-instrument index of tick numbers, brought up to date by queries
+        # so that the writer never pays for it; readers share it under index_lock
+        self._index = {}  # instrument_token -> deque of int64 arrays of tick numbers
+        self._indexed = 0  # Ticks covered by the index
+        self._pruned = 0  # written at the last sweep of stale index entries
+        self.index_lock = threading.Lock()
+        self._ingest_state = np.zeros(2, dtype=np.int64)  # [head, chunk count] for ingest_batch
+    
+    def _advance(self, count: int):
+        """Publish count ticks written by the writer"""
+        self.count = min(self.count + count, self.size)
+        self.tail = (self.head - self.count) % self.size
+        self.written += count
     
     def push(self, tick: TickData) -> bool:
         """
         Add tick data to buffer
         Returns True if successful, False if buffer is full
         """
-        with self.lock:
-            if self.count >= self.size:
-                # Buffer is full, overwrite oldest data
-                self.tail = (self.tail + 1) % self.size
-            else:
-                self.count += 1
-            
-            # Convert TickData to structured array format
-            self.data[self.head] = (
-                tick.instrument_token,
-                tick.timestamp,
-                tick.last_price,
-                tick.volume,
-                tick.open_price,
-                tick.high_price,
-                tick.low_price,
-                tick.prev_close,
-                tick.change,
-                tick.change_percent,
-                tick.exchange_timestamp,
-                0.0,  # bid_price - filled by market depth if available
-                0.0,  # ask_price
-                0,    # bid_qty
-                0,    # ask_qty
-                0     # oi
-            )
-            
-            self.head = (self.head + 1) % self.size
-            return True
+        return self.push_raw(*tick)
+    
+    def push_raw(self, instrument_token: int, timestamp: int, last_price: float, volume: int,
+                 open_price: float, high_price: float, low_price: float, prev_close: float,
+                 change: float, change_percent: float, exchange_timestamp: int,
+                 bid_price: float = 0.0, ask_price: float = 0.0,
+                 bid_qty: int = 0, ask_qty: int = 0, oi: int = 0) -> bool:
+        """
+        Add one tick given as TICK_DTYPE field values (no TickData needed)
+        Returns True if successful, False if buffer is full
+        """
+        self.reserved = self.written + 1
+        
+        # Pack the fields straight into the slot's bytes (no row tuple
+        # conversion); arguments are in TICK_DTYPE order
+        _TICK_ROW.pack_into(
+            self._memory, self.head * TICK_DTYPE.itemsize,
+            timestamp, exchange_timestamp, instrument_token, last_price, volume,
+            open_price, high_price, low_price, prev_close,
+            change, change_percent,
+            bid_price, ask_price, bid_qty, ask_qty, oi
+        )
+        
+        self.head = (self.head + 1) % self.size
+        self._advance(1)
+        return True
+    
+    def push_bytes(self, payload) -> bool:
+        """
+        Add one tick already encoded as a TICK_DTYPE record (bytes-like,
+        exactly TICK_DTYPE.itemsize long), copied into the slot as-is
+        Returns True if successful, False if buffer is full
+        """
+        if len(payload) != TICK_DTYPE.itemsize:
+            raise ValueError(f"tick payload must be {TICK_DTYPE.itemsize} bytes, got {len(payload)}")
+        self.reserved = self.written + 1
+        
+        offset = self.head * TICK_DTYPE.itemsize
+        self._memory[offset:offset + TICK_DTYPE.itemsize] = payload
+        
+        self.head = (self.head + 1) % self.size
+        self._advance(1)
+        return True
+    
+    def push_batch(self, ticks: np.ndarray) -> int:
+        """
+        Add a batch of ticks (TICK_DTYPE array) to buffer
+        Returns number of ticks written; oldest data is overwritten when full
+        """
+        count = min(len(ticks), self.size)
+        ticks = np.ascontiguousarray(ticks)  # No-op for batches from the tick ring
+        assert ticks.dtype == TICK_DTYPE, "tick batches must be TICK_DTYPE arrays"
+        rows = ticks.view(np.uint8).reshape(len(ticks), TICK_DTYPE.itemsize)
+        
+        # The copy runs in compiled code without the GIL
+        self.reserved = self.written + count
+        self.head = ingest_ticks(rows, self.rows, self.head)
+        self._advance(count)
+        return count
+    
+    def push_ticks(self, ticks: List[TickData]) -> int:
+        """
+        Add a list of TickData to buffer as one batch (one kernel call)
+        Returns number of ticks written; depth fields (bid/ask, oi) are left at zero
+        """
+        staging = np.zeros(len(ticks), dtype=TICK_DTYPE)
+        staging[list(TickData._fields)] = ticks
+        return self.push_batch(staging)
+    
+    def push_batch_and_copy(self, ticks: np.ndarray, chunk: np.ndarray, chunk_count: int) -> int:
+        """
+        Add a batch of ticks to buffer and copy it into chunk[chunk_count:] in the same pass
+        Returns number of ticks copied into chunk (limited by its free space)
+        """
+        count = min(len(ticks), self.size)
+        ticks = np.ascontiguousarray(ticks)
+        assert ticks.dtype == TICK_DTYPE and chunk.dtype == TICK_DTYPE, \
+            "tick batches must be TICK_DTYPE arrays"
+        rows = ticks.view(np.uint8).reshape(len(ticks), TICK_DTYPE.itemsize)
+        chunk_rows = chunk.view(np.uint8).reshape(len(chunk), TICK_DTYPE.itemsize)
+        
+        state = self._ingest_state
+        state[0] = self.head
+        state[1] = chunk_count
+        self.reserved = self.written + count
+        stored = ingest_batch(rows, self.rows, chunk_rows, state)
+        self.head = int(state[0])
+        self._advance(count)
+        return stored
     
     def get_latest(self, count: int = 1) -> np.ndarray:
         """Get latest N ticks"""
-        with self.lock:
-            if self.count == 0:
-                return np.array([], dtype=TICK_DTYPE)
-            
-            count = min(count, self.count)
-            indices = []
-            
-            for i in range(count):
-                idx = (self.head - 1 - i) % self.size
-                indices.append(idx)
-            
-            return self.data[indices[::-1]]  # Reverse to get chronological order
+        written = self.written
+        available = min(written, self.size)
+        if available == 0:
+            return np.array([], dtype=TICK_DTYPE)
+        
+        count = min(count, available)
+        # Slots of the last `count` tick numbers, already in chronological order
+        indices = np.arange(written - count, written, dtype=np.int64) % self.size
+        latest = self.data[indices]
+        
+        # Keep only ticks the writer had not started to overwrite
+        valid = min(count, written - self.reserved + self.size)
+        return latest[count - valid:]
+    
+    def _update_index(self, written: int):
+        """Index ticks written since the last query by instrument (caller holds index_lock)"""
+        oldest = written - min(written, self.size)
+        start = max(self._indexed, oldest)
+        if start < written:
+            # Group the new tick numbers by instrument, keeping arrival order
+            ticks = np.arange(start, written, dtype=np.int64)
+            tokens = self.data['instrument_token'][ticks % self.size]
+            
+            # Tokens read from slots being overwritten are not indexed
+            valid_from = self.reserved - self.size
+            if start < valid_from:
+                keep = ticks >= valid_from
+                ticks = ticks[keep]
+                tokens = tokens[keep]
+            
+            order = np.argsort(tokens, kind='stable')
+            tokens = tokens[order]
+            ticks = ticks[order]
+            bounds = np.flatnonzero(np.diff(tokens)) + 1
+            
+            firsts = tokens[np.concatenate(([0], bounds))].tolist() if len(ticks) else []
+            for token, group in zip(firsts, np.split(ticks, bounds)):
+                chunks = self._index.get(token)
+                if chunks is None:
+                    chunks = self._index[token] = deque()
+                chunks.append(group)
+            self._indexed = written
+        
+        # Once per ring's worth of ticks, drop entries that have been overwritten
+        if written - self._pruned >= self.size:
+            for token, chunks in list(self._index.items()):
+                while chunks and chunks[0][-1] < oldest:
+                    chunks.popleft()
+                if not chunks:
+                    del self._index[token]
+            self._pruned = written
     
     def get_by_instrument(self, instrument_token: int, count: int = 100) -> np.ndarray:
-        """Get latest ticks for specific instrument"""
-        with self.lock:
-            if self.count == 0:
+        """Get latest ticks for specific instrument (in arrival order)"""
+        with self.index_lock:
+            written = self.written  # Taken under the lock so the index never runs ahead of it
+            if written == 0:
                 return np.array([], dtype=TICK_DTYPE)
             
-            # Find all ticks for this instrument
-            mask = self.data['instrument_token'] == instrument_token
-            matching_ticks = self.data[mask]
-            
-            if len(matching_ticks) == 0:
+            self._update_index(written)
+            chunks = self._index.get(instrument_token)
+            if not chunks:
                 return np.array([], dtype=TICK_DTYPE)
             
-            # Sort by timestamp and return latest
-            sorted_ticks = np.sort(matching_ticks, order='timestamp')
-            return sorted_ticks[-count:] if len(sorted_ticks) >= count else sorted_ticks
+            # Walk back from the newest chunk until count ticks are found
+            oldest = written - min(written, self.size)
+            parts = []
+            needed = count
+            for chunk in reversed(chunks):
+                part = chunk[-needed:]
+                parts.append(part)
+                needed -= len(part)
+                if needed <= 0 or part[0] < oldest:
+                    break
+        
+        ticks = np.concatenate(parts[::-1])
+        ticks = ticks[ticks >= oldest]
+        latest = self.data[ticks % self.size]
+        
+        # Keep only ticks the writer had not started to overwrite
+        return latest[ticks >= self.reserved - self.size]
     
     def clear(self):
-        """Clear all data from buffer"""
-        with self.lock:
-            self.head = 0
-            self.tail = 0
-            self.count = 0
-            self.data.fill(0)
+        """Clear all data from buffer (writer side, or while nothing is written)
+        
+        Only the counters are reset: readers never look past `written`, and
+        pushes overwrite the slots they use, so the old bytes are unreachable.
+        """
+        self.written = 0
+        self.reserved = 0
+        self.head = 0
+        self.tail = 0
+        self.count = 0
+        with self.index_lock:
+            self._index.clear()
+            self._indexed = 0
+            self._pruned = 0
+
+
+class SPSCTickRing:
+    """
+    Single-producer single-consumer tick ring for the WebSocket -> processor handoff
+    
+    KiteTicker delivers every connection's ticks on the one Twisted reactor
+    thread, so there is exactly one producer. head and tail only grow and are
+    each written by one side; a tail store after the slot copy publishes the
+    ticks (and a head store after the read releases the slots), which the GIL
+    makes atomic, so no lock or condition variable is involved.
+    """
+    
+    def __init__(self, capacity: int):
+        """Initialize ring with at least the given capacity (rounded up to a power of two)"""
+        self.capacity = 1 << max(capacity - 1, 1).bit_length()
+        self.mask = self.capacity - 1
+        self.data = np.zeros(self.capacity, dtype=TICK_DTYPE, order='C')
+        self.head = 0  # Next position to read (consumer-owned)
+        self.tail = 0  # Next position to write (producer-owned)
+    
+    def __len__(self) -> int:
+        """Number of ticks waiting in the ring"""
+        return self.tail - self.head
+    
+    def push(self, ticks: np.ndarray) -> int:
+        """
+        Copy ticks into the ring (producer side)
+        Returns number of ticks written; ticks that do not fit are dropped
+        """
+        # Slot copies are plain memcpy only for contiguous rows of the same dtype
+        assert ticks.dtype == TICK_DTYPE and ticks.strides[0] == TICK_DTYPE.itemsize, \
+            "tick batches must be C-contiguous TICK_DTYPE arrays"
+        
+        tail = self.tail
+        count = min(len(ticks), self.capacity - (tail - self.head))
+        if count:
+            start = tail & self.mask
+            first = min(count, self.capacity - start)
+            self.data[start:start + first] = ticks[:first]
+            self.data[:count - first] = ticks[first:count]
+            self.tail = tail + count
+        return count
+    
+    def pop(self, out: np.ndarray) -> int:
+        """
+        Move up to len(out) ticks into out (consumer side)
+        Returns number of ticks moved
+        """
+        head = self.head
+        count = min(len(out), self.tail - head)
+        if count:
+            start = head & self.mask
+            first = min(count, self.capacity - start)
+            out[:first] = self.data[start:start + first]
+            out[first:count] = self.data[:count - first]
+            self.head = head + count
+        return count
 
 
 class TickStorage:
@@ -155,6 +416,7 @@ class TickStorage:
         self.max_size = max_size
         self.mmap_file = None
         self.file_handle = None
+        self.ticks_view = None  # TICK_DTYPE array over the mapped file
         self.lock = threading.RLock()
         
         # Create storage directory if it doesn't exist
@@ -190,58 +452,70 @@ class TickStorage:
             self.file_handle = open(self.storage_path, 'r+b')
             self.mmap_file = mmap.mmap(self.file_handle.fileno(), self.max_size)
         
+        # Writes go straight into the mapped pages through an array view
+        self.ticks_view = np.frombuffer(self.mmap_file, dtype=TICK_DTYPE,
+                                        count=self.max_size // TICK_DTYPE.itemsize)
+        
+        # Ticks are appended; let the kernel read ahead and write back in bulk
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self.mmap_file.madvise(mmap.MADV_SEQUENTIAL)
+        
         logger.info(f"Initialized tick storage: {self.storage_path}")
     
     def write_ticks(self, ticks: np.ndarray, offset: int = 0) -> int:
         """
-        Write tick data to memory-mapped file
+        Write tick data (TICK_DTYPE array) to memory-mapped file
+        
+        offset is in bytes and a multiple of TICK_DTYPE.itemsize. Pages are
+        written back by the kernel; call flush() to force it.
         Returns number of bytes written
         """
         with self.lock:
             if self.mmap_file is None:
                 return 0
             
-            # Convert to bytes
-            tick_bytes = ticks.tobytes()
-            bytes_to_write = len(tick_bytes)
+            bytes_to_write = ticks.nbytes
             
             # Check if we have enough space
             if offset + bytes_to_write > self.max_size:
                 logger.warning("Tick storage full, wrapping around")
                 offset = 0
             
-            # Write to memory-mapped file
-            self.mmap_file.seek(offset)
-            self.mmap_file.write(tick_bytes)
-            self.mmap_file.flush()
+            # One copy into the mapped pages, no intermediate bytes object
+            row = offset // TICK_DTYPE.itemsize
+            self.ticks_view[row:row + len(ticks)] = ticks
             
             return bytes_to_write
     
+    def flush(self):
+        """Write dirty pages back to the file"""
+        with self.lock:
+            if self.mmap_file:
+                self.mmap_file.flush()
+    
     def read_ticks(self, offset: int = 0, count: int = 1000) -> np.ndarray:
-        """Read tick data from memory-mapped file"""
+        """
+        Read tick data from memory-mapped file (offset in bytes)
+        
+        Returns a read-only view of the mapped file, not a copy; copy it if it
+        must outlive close(), which cannot unmap while views are alive.
+        """
         with self.lock:
             if self.mmap_file is None:
                 return np.array([], dtype=TICK_DTYPE)
             
-            bytes_per_tick = TICK_DTYPE.itemsize
-            bytes_to_read = count * bytes_per_tick
-            
-            # Check bounds
-            if offset + bytes_to_read > self.max_size:
-                bytes_to_read = self.max_size - offset
-                count = bytes_to_read // bytes_per_tick
-            
-            # Read from memory-mapped file
-            self.mmap_file.seek(offset)
-            tick_bytes = self.mmap_file.read(bytes_to_read)
-            
-            # Convert back to structured array
-            return np.frombuffer(tick_bytes, dtype=TICK_DTYPE, count=count)
+            start = offset // TICK_DTYPE.itemsize
+            ticks = self.ticks_view[start:start + count]  # Slicing clips to the file
+            ticks.flags.writeable = False
+            return ticks
     
     def close(self):
         """Close storage and clean up resources"""
         with self.lock:
             if self.mmap_file:
+                # The array view must go before the map can be closed
+                self.ticks_view = None
+                self.mmap_file.flush()
                 self.mmap_file.close()
                 self.mmap_file = None
             
@@ -250,140 +524,297 @@ class TickStorage:
                 self.file_handle = None
 
 
+class TokenIndex:
+    """
+    Dense 0, 1, 2, ... indices for instrument tokens, in order of first sight
+    
+    A sorted copy of the tokens gives vectorized batch lookups with
+    searchsorted; it is rebuilt only when new instruments appear, which is
+    rare. Owners size their per-instrument arrays to len(index).
+    """
+    
+    def __init__(self):
+        """Initialize an empty index"""
+        self.indices = {}  # instrument_token -> index
+        self.tokens = []  # index -> instrument_token
+        self.sorted_tokens = np.empty(0, dtype=np.int64)
+        self.sorted_indices = np.empty(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.tokens)
+    
+    def get(self, instrument_token: int) -> Optional[int]:
+        """Index of an instrument, or None if it has not been seen"""
+        return self.indices.get(instrument_token)
+    
+    def add(self, instrument_tokens: List[int]) -> int:
+        """Assign indices to instruments not seen before, returning how many were added"""
+        new_tokens = [token for token in dict.fromkeys(instrument_tokens)
+                      if token not in self.indices]
+        if new_tokens:
+            for token in new_tokens:
+                self.indices[token] = len(self.tokens)
+                self.tokens.append(token)
+            
+            self.sorted_tokens = np.array(sorted(self.indices), dtype=np.int64)
+            self.sorted_indices = np.array([self.indices[token] for token in self.sorted_tokens.tolist()],
+                                           dtype=np.int64)
+        return len(new_tokens)
+    
+    def lookup(self, instrument_tokens: np.ndarray) -> np.ndarray:
+        """Map an array of tokens to their indices, adding instruments not seen before"""
+        tokens = instrument_tokens.astype(np.int64)
+        
+        positions = np.searchsorted(self.sorted_tokens, tokens)
+        known = positions < len(self.sorted_tokens)
+        known[known] = self.sorted_tokens[positions[known]] == tokens[known]
+        
+        if not known.all():
+            self.add(np.unique(tokens[~known]).tolist())
+            positions = np.searchsorted(self.sorted_tokens, tokens)
+        
+        return self.sorted_indices[positions]
+
+
 class TickAggregator:
     """
     High-performance tick aggregation for OHLCV calculations
+    
+    Current bars live in a dense array (one row per instrument, BAR_*
+    columns) that the aggregate_ticks kernel updates in place; bar dicts
+    are only built for completed bars and on request. Completed bars are
+    kept in a fixed-size BAR_DTYPE ring per instrument (the last max_bars).
     """
     
-    def __init__(self, aggregation_interval: int = 1000):  # 1 second default
+    def __init__(self, aggregation_interval: int = 1000, max_bars: int = 1000):  # 1 second default
         """Initialize tick aggregator"""
         self.aggregation_interval = aggregation_interval  # milliseconds
-        self.current_bars = {}  # instrument_token -> current bar data
-        self.completed_bars = defaultdict(list)  # instrument_token -> list of completed bars
+        self.max_bars = max_bars
         self.lock = threading.RLock()
+        
+        # Dense current bars, one row per instrument in rows
+        self.rows = TokenIndex()
+        self.bars = np.zeros((0, BAR_FIELDS), dtype=np.float64)
+        
+        # Completed bar rings: bar n of a row is at bar_history[row, n % max_bars]
+        self.bar_history = np.zeros((0, max_bars), dtype=BAR_DTYPE)
+        self.bar_counts = np.zeros(0, dtype=np.int64)  # Bars completed per row
+        
+        # Output buffers for bars completed by one batch (grown as needed)
+        self._completed = np.zeros((0, BAR_FIELDS), dtype=np.float64)
+        self._completed_rows = np.zeros(0, dtype=np.int64)
+    
+    def register_instruments(self, instrument_tokens: List[int]):
+        """Assign rows in the dense bar array to new instruments"""
+        with self.lock:
+            self.rows.add(instrument_tokens)
+            self._grow()
+    
+    def _grow(self):
+        """Add zeroed bar rows for instruments added to rows (caller holds the lock)"""
+        grow = len(self.rows) - len(self.bars)
+        if grow <= 0:
+            return
+        
+        self.bars = np.concatenate(
+            [self.bars, np.zeros((grow, BAR_FIELDS), dtype=np.float64)]
+        )
+        self.bar_history = np.concatenate(
+            [self.bar_history, np.zeros((grow, self.max_bars), dtype=BAR_DTYPE)]
+        )
+        self.bar_counts = np.concatenate(
+            [self.bar_counts, np.zeros(grow, dtype=np.int64)]
+        )
+    
+    def _bar_dict(self, row: int, bar: List[float]) -> Dict:
+        """Build the bar dict for the values of a dense bar row"""
+        open_price, high, low, close, volume, timestamp, tick_count = bar
+        return {
+            'instrument_token': self.rows.tokens[row],
+            'timestamp': int(timestamp),
+            'open': open_price,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': int(volume),
+            'tick_count': int(tick_count)
+        }
     
     def process_tick(self, tick: TickData) -> Optional[Dict]:
         """
         Process incoming tick and return completed bar if interval elapsed
         """
+        batch = np.zeros(1, dtype=TICK_DTYPE)
+        batch[list(TickData._fields)] = [tick]
+        completed_bars = self.process_batch(batch)
+        return completed_bars[0] if completed_bars else None
+    
+    def process_batch(self, ticks: np.ndarray) -> List[Dict]:
+        """
+        Process a batch of ticks (TICK_DTYPE array) and return completed bars
+        """
+        if len(ticks) == 0:
+            return []
+        
         with self.lock:
-            instrument_token = tick.instrument_token
-            
-            # Calculate bar timestamp (aligned to interval)
-            bar_timestamp = (tick.timestamp // self.aggregation_interval) * self.aggregation_interval
-            
-            # Get or create current bar
-            if instrument_token not in self.current_bars:
-                self.current_bars[instrument_token] = {
-                    'instrument_token': instrument_token,
-                    'timestamp': bar_timestamp,
-                    'open': tick.last_price,
-                    'high': tick.last_price,
-                    'low': tick.last_price,
-                    'close': tick.last_price,
-                    'volume': tick.volume,
-                    'tick_count': 1
-                }
-                return None
-            
-            current_bar = self.current_bars[instrument_token]
-            
-            # Check if we need to start a new bar
-            if bar_timestamp > current_bar['timestamp']:
-                # Complete current bar
-                completed_bar = current_bar.copy()
-                self.completed_bars[instrument_token].append(completed_bar)
-                
-                # Start new bar
-                self.current_bars[instrument_token] = {
-                    'instrument_token': instrument_token,
-                    'timestamp': bar_timestamp,
-                    'open': tick.last_price,
-                    'high': tick.last_price,
-                    'low': tick.last_price,
-                    'close': tick.last_price,
-                    'volume': tick.volume,
-                    'tick_count': 1
-                }
-                
-                return completed_bar
-            
-            # Update current bar
-            current_bar['high'] = max(current_bar['high'], tick.last_price)
-            current_bar['low'] = min(current_bar['low'], tick.last_price)
-            current_bar['close'] = tick.last_price
-            current_bar['volume'] += tick.volume
-            current_bar['tick_count'] += 1
-            
-            return None
+            rows = self.rows.lookup(ticks['instrument_token'])
+            self._grow()
+            
+            # A batch completes at most one bar per tick
+            if len(self._completed) < len(ticks):
+                self._completed = np.zeros((len(ticks), BAR_FIELDS), dtype=np.float64)
+                self._completed_rows = np.zeros(len(ticks), dtype=np.int64)
+            
+            done = aggregate_ticks(rows, ticks['timestamp'], ticks['last_price'], ticks['volume'],
+                                   self.aggregation_interval, self.bars,
+                                   self._completed, self._completed_rows)
+            
+            completed_bars = []
+            for row, bar in zip(self._completed_rows[:done].tolist(), self._completed[:done].tolist()):
+                # Overwrite the row's oldest bar once its ring is full
+                bar_number = self.bar_counts[row]
+                open_price, high, low, close, volume, timestamp, tick_count = bar
+                self.bar_history[row, bar_number % self.max_bars] = (
+                    timestamp, open_price, high, low, close, volume, tick_count
+                )
+                self.bar_counts[row] = bar_number + 1
+                completed_bars.append(self._bar_dict(row, bar))
+        
+        return completed_bars
     
-    def get_bars(self, instrument_token: int, count: int = 100) -> List[Dict]:
-        """Get latest completed bars for instrument"""
+    def get_bars(self, instrument_token: int, count: int = 100) -> np.ndarray:
+        """Get latest completed bars for instrument (BAR_DTYPE array, oldest first)"""
         with self.lock:
-            bars = self.completed_bars.get(instrument_token, [])
-            return bars[-count:] if len(bars) >= count else bars
+            row = self.rows.get(instrument_token)
+            if row is None:
+                return np.array([], dtype=BAR_DTYPE)
+            
+            total = int(self.bar_counts[row])
+            count = min(count, total, self.max_bars)
+            start = (total - count) % self.max_bars
+            end = start + count
+            
+            # At most two slices (the second one wraps around)
+            history = self.bar_history[row]
+            if end <= self.max_bars:
+                return history[start:end].copy()
+            return np.concatenate((history[start:], history[:end - self.max_bars]))
     
     def get_current_bar(self, instrument_token: int) -> Optional[Dict]:
         """Get current incomplete bar for instrument"""
         with self.lock:
-            return self.current_bars.get(instrument_token)
+            row = self.rows.get(instrument_token)
+            if row is None or self.bars[row, BAR_TICK_COUNT] == 0:
+                return None
+            return self._bar_dict(row, self.bars[row].tolist())
 
 
 class PerformanceMonitor:
     """
     Monitor tick processing performance
+    
+    Per-instrument counters are dense arrays indexed by an instrument slot
+    and updated by the record_ticks kernel, so recording a batch does no
+    per-tick dict work. Each slot keeps running (Welford) mean/variance
+    state, which get_stats pools across instruments.
     """
     
-    def __init__(self):
+    def __init__(self, capacity: int = 1024, max_samples: int = 1000):
         """Initialize performance monitor"""
-        self.tick_counts = defaultdict(int)
-        self.processing_times = defaultdict(list)
-        self.last_reset = time.time()
+        # instrument_token -> slot
+        self.slots = TokenIndex()
+        
+        # Per-slot statistics (grown as instruments appear)
+        self.tick_counts = np.zeros(capacity, dtype=np.int64)
+        self.time_means = np.zeros(capacity, dtype=np.float64)
+        self.time_m2 = np.zeros(capacity, dtype=np.float64)
+        self.time_max = np.zeros(capacity, dtype=np.float64)
+        
+        # Recent per-tick processing times, one sample per recorded batch,
+        # kept in a circular buffer (sample n is at n % max_samples)
+        self.processing_times = np.zeros(max_samples, dtype=np.float64)
+        self.sample_count = 0
+        
+        self.last_reset = time.monotonic()
         self.lock = threading.RLock()
     
+    def _slots_for(self, instrument_tokens: np.ndarray) -> np.ndarray:
+        """Map instrument tokens to slots, assigning slots to new instruments"""
+        slots = self.slots.lookup(instrument_tokens)
+        
+        if len(self.slots) > len(self.tick_counts):
+            grow = max(len(self.slots), 2 * len(self.tick_counts)) - len(self.tick_counts)
+            self.tick_counts = np.concatenate([self.tick_counts, np.zeros(grow, dtype=np.int64)])
+            self.time_means = np.concatenate([self.time_means, np.zeros(grow)])
+            self.time_m2 = np.concatenate([self.time_m2, np.zeros(grow)])
+            self.time_max = np.concatenate([self.time_max, np.zeros(grow)])
+        
+        return slots
+    
     def record_tick(self, instrument_token: int, processing_time: float):
         """Record tick processing metrics"""
+        self.record_batch(np.array([instrument_token], dtype=np.int64), processing_time)
+    
+    def record_batch(self, instrument_tokens: np.ndarray, processing_time: float):
+        """Record metrics for a batch, spreading its processing time over its ticks"""
+        if len(instrument_tokens) == 0:
+            return
+        
+        tick_time = processing_time / len(instrument_tokens)
         with self.lock:
-            self.tick_counts[instrument_token] += 1
-            self.processing_times[instrument_token].append(processing_time)
+            slots = self._slots_for(instrument_tokens)
+            record_ticks(slots, tick_time, self.tick_counts, self.time_means, self.time_m2, self.time_max)
             
-            # Keep only last 1000 processing times per instrument
-            if len(self.processing_times[instrument_token]) > 1000:
-                self.processing_times[instrument_token] = self.processing_times[instrument_token][-1000:]
+            # Overwrite the oldest sample once the buffer is full
+            self.processing_times[self.sample_count % len(self.processing_times)] = tick_time
+            self.sample_count += 1
     
     def get_stats(self) -> Dict:
         """Get performance statistics"""
         with self.lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_reset
+            elapsed = time.monotonic() - self.last_reset
             
-            total_ticks = sum(self.tick_counts.values())
+            total_ticks = int(self.tick_counts.sum())
             
             stats = {
                 'total_ticks': total_ticks,
                 'ticks_per_second': total_ticks / elapsed if elapsed > 0 else 0,
                 'elapsed_seconds': elapsed,
-                'instruments_count': len(self.tick_counts),
+                'instruments_count': int(np.count_nonzero(self.tick_counts)),
                 'avg_processing_time': 0.0,
+                'std_processing_time': 0.0,
                 'max_processing_time': 0.0,
             }
             
-            # Calculate processing time statistics
-            all_times = []
-            for times in self.processing_times.values():
-                all_times.extend(times)
-            
-            if all_times:
-                stats['avg_processing_time'] = np.mean(all_times)
-                stats['max_processing_time'] = np.max(all_times)
-                stats['p95_processing_time'] = np.percentile(all_times, 95)
-                stats['p99_processing_time'] = np.percentile(all_times, 99)
+            # Pool the per-instrument running stats (Chan et al.), O(instruments)
+            if total_ticks:
+                mean = float(self.tick_counts @ self.time_means) / total_ticks
+                spread = self.time_means - mean
+                m2 = self.time_m2.sum() + float(self.tick_counts @ (spread * spread))
+                stats['avg_processing_time'] = mean
+                stats['std_processing_time'] = (m2 / total_ticks) ** 0.5
+                stats['max_processing_time'] = self.time_max.max()
+            
+            if self.sample_count:
+                # Only the most recent max_samples samples are kept
+                n = min(self.sample_count, len(self.processing_times))
+                samples = self.processing_times[:n]  # Order does not matter here
+                # One O(n) partition places both ranks instead of two full sorts
+                last = n - 1
+                k95 = min(int(0.95 * n), last)
+                k99 = min(int(0.99 * n), last)
+                ranked = np.partition(samples, [k95, k99])
+                stats['p95_processing_time'] = float(ranked[k95])
+                stats['p99_processing_time'] = float(ranked[k99])
             
             return stats
     
     def reset(self):
-        """Reset performance counters"""
+        """Reset performance counters (instrument slots are kept)"""
         with self.lock:
-            self.tick_counts.clear()
-            self.processing_times.clear()
-            self.last_reset = time.time()
\ No newline at end of file
+            self.tick_counts.fill(0)
+            self.time_means.fill(0.0)
+            self.time_m2.fill(0.0)
+            self.time_max.fill(0.0)
+            self.sample_count = 0
+            self.last_reset = time.monotonic()
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""
+Numeric Tick Kernels
+
+Small nopython helpers for the per-tick hot path. If the ahead-of-time
+compiled ``_tick_kernels`` extension is available it is used directly,
+otherwise the kernels are JIT-compiled with Numba at import time.
+"""
+
+import numpy as np
+from numba import njit
+
+# Tick action codes returned by tick_action
+ACTION_NONE = 0
+ACTION_LARGE_MOVE = 1   # More than 1% change
+ACTION_SIGNAL = 2       # More than 2% change (also a large move)
+
+# Column layout of the dense current-bar array (one row per instrument)
+BAR_OPEN, BAR_HIGH, BAR_LOW, BAR_CLOSE, BAR_VOLUME, BAR_TIMESTAMP, BAR_TICK_COUNT = range(7)
+BAR_FIELDS = 7
+
+# Kernel signatures (shared by the JIT fallback and the AOT build)
+TICK_ACTION_SIGNATURE = 'uint8(float64)'
+INGEST_TICKS_SIGNATURE = 'int64(uint8[:, :], uint8[:, :], int64)'
+RECORD_TICKS_SIGNATURE = 'void(int64[:], float64, int64[:], float64[:], float64[:], float64[:])'
+INGEST_BATCH_SIGNATURE = 'int64(uint8[:, :], uint8[:, :], uint8[:, :], int64[:])'
+AGGREGATE_TICKS_SIGNATURE = ('int64(int64[:], uint64[:], float32[:], uint32[:], int64, '
+                             'float64[:, :], float64[:, :], int64[:])')
+
+
+def _tick_action(change_percent):
+    """Classify a tick by its percentage change"""
+    abs_change = abs(change_percent)
+    if abs_change > 2.0:
+        return ACTION_SIGNAL
+    if abs_change > 1.0:
+        return ACTION_LARGE_MOVE
+    return ACTION_NONE
+
+
+def _ingest_ticks(ticks, ring, head):
+    """
+    Copy tick rows into a ring buffer starting at head, returning the new head
+    
+    Both arrays are raw TICK_DTYPE rows (uint8, one row per tick); the
+    oldest rows are overwritten once the ring is full.
+    """
+    size = ring.shape[0]
+    count = ticks.shape[0]
+    if count > size:
+        ticks = ticks[count - size:]
+        count = size
+    
+    # At most two contiguous copies (the second one wraps around)
+    first = min(count, size - head)
+    ring[head:head + first] = ticks[:first]
+    ring[:count - first] = ticks[first:]
+    return (head + count) % size
+
+
+def _ingest_batch(ticks, ring, chunk, state):
+    """
+    Copy tick rows into a ring buffer and a storage chunk in a single pass
+    
+    state holds [ring head, chunk count] and is advanced in place. Each row
+    is read once and written to both sinks; rows go to the chunk only while
+    it has room. Returns the number of rows copied into the chunk.
+    """
+    size = ring.shape[0]
+    count = ticks.shape[0]
+    head = state[0]
+    chunk_count = state[1]
+    stored = min(count, chunk.shape[0] - chunk_count)
+    skip = max(count - size, 0)  # Rows the ring would overwrite within this batch
+    
+    for i in range(count):
+        row = ticks[i]
+        if i >= skip:
+            ring[head] = row
+            head += 1
+            if head == size:
+                head = 0
+        if i < stored:
+            chunk[chunk_count + i] = row
+    
+    state[0] = head
+    state[1] = chunk_count + stored
+    return stored
+
+
+def _aggregate_ticks(rows, timestamps, prices, volumes, interval, bars, completed, completed_rows):
+    """
+    Fold ticks into the current bars of their rows, returning the number of completed bars
+    
+    A row whose BAR_TICK_COUNT is 0 has no bar yet. A tick past its bar's
+    interval copies the bar into completed (its row into completed_rows)
+    and starts a new bar; ticks older than the bar are folded into it.
+    """
+    done = 0
+    for i in range(rows.shape[0]):
+        row = rows[i]
+        price = np.float64(prices[i])
+        volume = np.float64(volumes[i])
+        bar_timestamp = (np.int64(timestamps[i]) // interval) * interval
+        bar = bars[row]
+        
+        tick_count = bar[BAR_TICK_COUNT]
+        if tick_count > 0 and bar_timestamp <= bar[BAR_TIMESTAMP]:
+            bar[BAR_HIGH] = max(bar[BAR_HIGH], price)
+            bar[BAR_LOW] = min(bar[BAR_LOW], price)
+            bar[BAR_CLOSE] = price
+            bar[BAR_VOLUME] += volume
+            bar[BAR_TICK_COUNT] = tick_count + 1
+            continue
+        
+        if tick_count > 0:
+            completed[done] = bar
+            completed_rows[done] = row
+            done += 1
+        
+        bar[BAR_OPEN] = price
+        bar[BAR_HIGH] = price
+        bar[BAR_LOW] = price
+        bar[BAR_CLOSE] = price
+        bar[BAR_VOLUME] = volume
+        bar[BAR_TIMESTAMP] = bar_timestamp
+        bar[BAR_TICK_COUNT] = 1
+    return done
+
+
+def _record_ticks(slots, tick_time, tick_counts, time_means, time_m2, time_max):
+    """
+    Add one tick_time sample per tick to the per-instrument (slot-indexed) stats
+    
+    Mean and M2 (sum of squared deviations) follow Welford's online update.
+    """
+    for i in range(slots.shape[0]):
+        slot = slots[i]
+        tick_counts[slot] += 1
+        delta = tick_time - time_means[slot]
+        time_means[slot] += delta / tick_counts[slot]
+        time_m2[slot] += delta * (tick_time - time_means[slot])
+        if tick_time > time_max[slot]:
+            time_max[slot] = tick_time
+
+
+try:
+    from ._tick_kernels import tick_action, ingest_ticks, ingest_batch, aggregate_ticks, record_ticks
+except ImportError:
+    tick_action = njit(TICK_ACTION_SIGNATURE, cache=True, fastmath=True)(_tick_action)
+    ingest_ticks = njit(INGEST_TICKS_SIGNATURE, cache=True, nogil=True)(_ingest_ticks)
+    ingest_batch = njit(INGEST_BATCH_SIGNATURE, cache=True, nogil=True)(_ingest_batch)
+    aggregate_ticks = njit(AGGREGATE_TICKS_SIGNATURE, cache=True, nogil=True)(_aggregate_ticks)
+    record_ticks = njit(RECORD_TICKS_SIGNATURE, cache=True, nogil=True)(_record_ticks)
\ No newline at end of file
@@ -7,7 +7,7 @@ validation, and type safety.
 
 import os
 import yaml
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 from pathlib import Path
 from dataclasses import dataclass, field
 import logging
@@ -26,7 +26,30 @@ def get_credential_manager():
     return _credential_manager
 
 
-@dataclass
+def _env_bool(value: str) -> bool:
+    """Parse a boolean environment variable"""
+    return value.lower() in ('true', '1', 'yes')
+
+
+# Environment variable -> nested config key path, and the converter applied
+# to the raw string so validation and readers see the configured type
+ENV_MAPPINGS = (
+    ('KITE_API_KEY', ('kite', 'api_key'), str),
+    ('KITE_API_SECRET', ('kite', 'api_secret'), str),
+    ('KITE_USER_ID', ('kite', 'user_id'), str),
+    ('KITE_PASSWORD', ('kite', 'password'), str),
+    ('KITE_TOTP_SECRET', ('kite', 'totp_secret'), str),
+    ('KITE_TELEGRAM_TOKEN', ('notifications', 'telegram', 'token'), str),
+    ('KITE_TELEGRAM_CHAT_ID', ('notifications', 'telegram', 'chat_id'), str),
+    ('KITE_LOG_LEVEL', ('logging', 'level'), str),
+    ('KITE_DEBUG', ('debug', 'enabled'), _env_bool),
+    ('KITE_WORKER_THREADS', ('performance', 'worker_threads'), int),
+    ('KITE_BATCH_SIZE', ('performance', 'batch_size'), int),
+    ('KITE_RISK_PER_TRADE', ('trading', 'risk_per_trade'), float),
+)
+
+
+@dataclass(frozen=True)
 class KiteConfig:
     """Kite Connect API configuration"""
     api_key: str = ""
@@ -49,7 +72,7 @@ class KiteConfig:
     ping_interval: int = 30
 
 
-@dataclass
+@dataclass(frozen=True)
 class PerformanceConfig:
     """Performance optimization settings"""
     buffer_size: int = 10000
@@ -57,12 +80,17 @@ class PerformanceConfig:
     worker_threads: int = 4
     io_threads: int = 2
     batch_size: int = 500
+    tick_batch_size: int = 256
+    tick_batch_window_us: int = 200
     tick_aggregation_interval: int = 100
+    bar_history_size: int = 1000  # Completed bars kept per instrument
     use_mmap: bool = True
     mmap_size: int = 100000000
+    cpu_affinity: Dict[str, List[int]] = field(default_factory=dict)  # thread role -> CPUs
+    realtime_priority: int = 0  # SCHED_FIFO priority for the tick processor (0 = off)
 
 
-@dataclass
+@dataclass(frozen=True)
 class TradingConfig:
     """Trading parameters and limits"""
     market_start: str = "09:15:00"
@@ -76,7 +104,7 @@ class TradingConfig:
     order_retry_delay: int = 1
 
 
-@dataclass
+@dataclass(frozen=True)
 class DataFeedConfig:
     """Data feed configuration"""
     primary_source: str = "websocket"
@@ -87,10 +115,12 @@ class DataFeedConfig:
     subscription_batch_size: int = 100
     store_ticks: bool = True
     tick_storage_format: str = "binary"
+    tick_storage_chunk_size: int = 4096
+    tick_storage_flush_ms: int = 1000
     max_storage_days: int = 7
 
 
-@dataclass
+@dataclass(frozen=True)
 class RiskConfig:
     """Risk management parameters"""
     max_positions: int = 20
@@ -102,7 +132,7 @@ class RiskConfig:
     drawdown_limit: float = 0.1
 
 
-@dataclass
+@dataclass(frozen=True)
 class LoggingConfig:
     """Logging configuration"""
     level: str = "INFO"
@@ -121,7 +151,10 @@ class ConfigManager:
     """
     
     _instance = None
+    _initialized = False  # Set once the first load succeeded
     _config = None
+    _sections = None  # section name -> frozen dataclass, rebuilt on (re)load
+    _flat = None  # dotted key -> value for get(), rebuilt on (re)load
     
     def __new__(cls):
         """Singleton pattern for global configuration access"""
@@ -130,9 +163,12 @@ class ConfigManager:
         return cls._instance
     
     def __init__(self):
-        if self._config is None:
-            self._config = {}
-            self._load_config()
+        # Every ConfigManager() call lands here; only the first one loads
+        if ConfigManager._initialized:
+            return
+        self._config = {}
+        self._load_config()
+        ConfigManager._initialized = True
     
     def _load_config(self):
         """Load configuration from YAML file and environment variables"""
@@ -154,12 +190,38 @@ class ConfigManager:
             # Validate configuration
             self._validate_config()
             
+            # Build the section dataclasses once; the properties return these
+            self._build_sections()
+            self._flat = self._flatten(self._config)
+            
             logger.info("Configuration loaded successfully")
             
         except Exception as e:
             logger.error(f"Failed to load configuration: {e}")
             raise
     
+    def _build_sections(self):
+        """Build every configuration section from the loaded dict"""
+        self._sections = {
+            'kite': self._build_kite(),
+            'performance': self._build_performance(),
+            'trading': self._build_trading(),
+            'datafeed': self._build_datafeed(),
+            'risk': self._build_risk(),
+            'logging': self._build_logging(),
+        }
+    
+    @staticmethod
+    def _flatten(config: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+        """Map every dotted key path (sections included) to its value"""
+        flat = {}
+        for key, value in config.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, dict):
+                flat.update(ConfigManager._flatten(value, f"{path}."))
+        return flat
+    
     def _get_config_path(self) -> Path:
         """Get configuration file path"""
         # Check environment variable first
@@ -223,31 +285,21 @@ class ConfigManager:
             logger.warning(f"Could not load encrypted credentials: {e}")
         
         # Then override with environment variables (for development/testing)
-        env_mappings = {
-            'KITE_API_KEY': ['kite', 'api_key'],
-            'KITE_API_SECRET': ['kite', 'api_secret'],
-            'KITE_USER_ID': ['kite', 'user_id'],
-            'KITE_PASSWORD': ['kite', 'password'],
-            'KITE_TOTP_SECRET': ['kite', 'totp_secret'],
-            'KITE_TELEGRAM_TOKEN': ['notifications', 'telegram', 'token'],
-            'KITE_TELEGRAM_CHAT_ID': ['notifications', 'telegram', 'chat_id'],
-            'KITE_LOG_LEVEL': ['logging', 'level'],
-            'KITE_DEBUG': ['debug', 'enabled'],
-        }
-        
-        for env_var, config_path in env_mappings.items():
+        for env_var, config_path, convert in ENV_MAPPINGS:
             value = os.getenv(env_var)
             if value:
+                try:
+                    value = convert(value)
+                except ValueError:
+                    # Keep the file/default value rather than storing a bad string
+                    logger.warning(f"Ignoring {env_var}: expected {convert.__name__}, got {value!r}")
+                    continue
+                
                 # Navigate to nested config location
                 current = config
                 for key in config_path[:-1]:
                     current = current.setdefault(key, {})
-                
-                # Set the value with proper type conversion
-                if env_var == 'KITE_DEBUG':
-                    current[config_path[-1]] = value.lower() in ('true', '1', 'yes')
-                else:
-                    current[config_path[-1]] = value
+                current[config_path[-1]] = value
                     
                 logger.debug(f"Loaded {env_var} from environment")
         
@@ -277,9 +329,8 @@ class ConfigManager:
         
         logger.debug("Configuration validation passed")
     
-    @property
-    def kite(self) -> KiteConfig:
-        """Get Kite Connect configuration"""
+    def _build_kite(self) -> KiteConfig:
+        """Build Kite Connect configuration"""
         kite_data = self._config.get('kite', {})
         rate_limits = kite_data.get('rate_limits', {})
         websocket = kite_data.get('websocket', {})
@@ -301,9 +352,8 @@ class ConfigManager:
             ping_interval=websocket.get('ping_interval', 30)
         )
     
-    @property
-    def performance(self) -> PerformanceConfig:
-        """Get performance configuration"""
+    def _build_performance(self) -> PerformanceConfig:
+        """Build performance configuration"""
         perf_data = self._config.get('performance', {})
         return PerformanceConfig(
             buffer_size=perf_data.get('buffer_size', 10000),
@@ -311,14 +361,18 @@ class ConfigManager:
             worker_threads=perf_data.get('worker_threads', 4),
             io_threads=perf_data.get('io_threads', 2),
             batch_size=perf_data.get('batch_size', 500),
+            tick_batch_size=perf_data.get('tick_batch_size', 256),
+            tick_batch_window_us=perf_data.get('tick_batch_window_us', 200),
             tick_aggregation_interval=perf_data.get('tick_aggregation_interval', 100),
+            bar_history_size=perf_data.get('bar_history_size', 1000),
             use_mmap=perf_data.get('use_mmap', True),
-            mmap_size=perf_data.get('mmap_size', 100000000)
+            mmap_size=perf_data.get('mmap_size', 100000000),
+            cpu_affinity=perf_data.get('cpu_affinity') or {},
+            realtime_priority=perf_data.get('realtime_priority', 0)
         )
     
-    @property
-    def trading(self) -> TradingConfig:
-        """Get trading configuration"""
+    def _build_trading(self) -> TradingConfig:
+        """Build trading configuration"""
         trading_data = self._config.get('trading', {})
         return TradingConfig(
             market_start=trading_data.get('market_start', '09:15:00'),
@@ -332,9 +386,8 @@ class ConfigManager:
             order_retry_delay=trading_data.get('order_retry_delay', 1)
         )
     
-    @property
-    def datafeed(self) -> DataFeedConfig:
-        """Get data feed configuration"""
+    def _build_datafeed(self) -> DataFeedConfig:
+        """Build data feed configuration"""
         datafeed_data = self._config.get('datafeed', {})
         return DataFeedConfig(
             primary_source=datafeed_data.get('primary_source', 'websocket'),
@@ -345,12 +398,13 @@ class ConfigManager:
             subscription_batch_size=datafeed_data.get('subscription_batch_size', 100),
             store_ticks=datafeed_data.get('store_ticks', True),
             tick_storage_format=datafeed_data.get('tick_storage_format', 'binary'),
+            tick_storage_chunk_size=datafeed_data.get('tick_storage_chunk_size', 4096),
+            tick_storage_flush_ms=datafeed_data.get('tick_storage_flush_ms', 1000),
             max_storage_days=datafeed_data.get('max_storage_days', 7)
         )
     
-    @property
-    def risk(self) -> RiskConfig:
-        """Get risk management configuration"""
+    def _build_risk(self) -> RiskConfig:
+        """Build risk management configuration"""
         risk_data = self._config.get('risk', {})
         return RiskConfig(
             max_positions=risk_data.get('max_positions', 20),
@@ -362,9 +416,8 @@ class ConfigManager:
             drawdown_limit=risk_data.get('drawdown_limit', 0.1)
         )
     
-    @property
-    def logging(self) -> LoggingConfig:
-        """Get logging configuration"""
+    def _build_logging(self) -> LoggingConfig:
+        """Build logging configuration"""
         logging_data = self._config.get('logging', {})
         return LoggingConfig(
             level=logging_data.get('level', 'INFO'),
@@ -377,18 +430,39 @@ class ConfigManager:
             performance_interval=logging_data.get('performance_interval', 300)
         )
     
+    @property
+    def kite(self) -> KiteConfig:
+        """Get Kite Connect configuration"""
+        return self._sections['kite']
+    
+    @property
+    def performance(self) -> PerformanceConfig:
+        """Get performance configuration"""
+        return self._sections['performance']
+    
+    @property
+    def trading(self) -> TradingConfig:
+        """Get trading configuration"""
+        return self._sections['trading']
+    
+    @property
+    def datafeed(self) -> DataFeedConfig:
+        """Get data feed configuration"""
+        return self._sections['datafeed']
+    
+    @property
+    def risk(self) -> RiskConfig:
+        """Get risk management configuration"""
+        return self._sections['risk']
+    
+    @property
+    def logging(self) -> LoggingConfig:
+        """Get logging configuration"""
+        return self._sections['logging']
+    
     def get(self, key: str, default: Any = None) -> Any:
-        """Get configuration value by key"""
-        keys = key.split('.')
-        value = self._config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        
-        return value
+        """Get configuration value by dotted key, e.g. 'performance.batch_size'"""
+        return self._flat.get(key, default)
     
     def reload(self):
         """Reload configuration from file"""
@@ -2,38 +2,122 @@
 Secure Credential Encryption and Management
 
 High-security encryption system for storing sensitive trading credentials
-using industry-standard encryption (Fernet/AES-256) with key derivation.
+using industry-standard encryption (AES-256-GCM) with key derivation.
 """
 
 import os
 import sys
+import asyncio
+import threading
 import base64
 import hashlib
 import getpass
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Union
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Credentials plaintext (de)serialization: compact (never read by a human)
+# with sorted keys, so equal credentials serialize identically. orjson
+# encodes straight to bytes when installed; otherwise one encoder instance
+# is reused, and its ensure_ascii output always fits the ASCII codec.
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(credentials: Dict[str, Any]) -> bytes:
+        return orjson.dumps(credentials, option=orjson.OPT_SORT_KEYS)
+else:
+    _json_loads = json.loads
+    _json_encoder = json.JSONEncoder(separators=(',', ':'), sort_keys=True)
+
+    def _json_dumps(credentials: Dict[str, Any]) -> bytes:
+        return _json_encoder.encode(credentials).encode('ascii')
+
+# Encrypted file layout: format byte | 12-byte nonce | AES-GCM ciphertext+tag.
+# The format byte names the key derivation and is also the associated data.
+# Files without one are legacy Fernet tokens (which always start with b'g'),
+# keyed with PBKDF2; every write uses the current format.
+_FORMAT_PBKDF2 = b'\x01'
+_FORMAT_SCRYPT = b'\x02'
+_NONCE_SIZE = 12
+
+# scrypt cost at OWASP's minimum (N=2^15, r=8, p=3): 32 MiB per derivation,
+# which GPUs cannot parallelize the way they do PBKDF2 iterations
+_SCRYPT_PARAMS = {'n': 2 ** 15, 'r': 8, 'p': 3, 'maxmem': 64 * 1024 * 1024}
+
+
+@lru_cache(maxsize=4)
+def _derive_key_cached(password: bytes, salt: bytes, kdf_format: bytes = _FORMAT_SCRYPT) -> bytes:
+    """Derive a raw 256-bit key, once per (password, salt, format)"""
+    if kdf_format == _FORMAT_SCRYPT:
+        return hashlib.scrypt(password, salt=salt, dklen=32, **_SCRYPT_PARAMS)
+    
+    # Files written before scrypt: one call into OpenSSL's PBKDF2
+    return hashlib.pbkdf2_hmac(
+        'sha256', password, salt,
+        100000,
+        dklen=32,  # 256 bits for AES-256
+    )
+
+
+@lru_cache(maxsize=4)
+def _cipher_for(key: bytes) -> AESGCM:
+    """AES-GCM context for a derived key, built once and reused across calls"""
+    return AESGCM(key)
+
+
+def _write_private_file(path: Path, data: bytes):
+    """Write data to path, creating the file owner-only (0600) in the same call"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 
 class CredentialEncryption:
     """
-    Secure credential encryption and decryption using Fernet (AES-256)
+    Secure credential encryption and decryption using AES-256-GCM
     """
     
-    def __init__(self, master_password: Optional[str] = None):
+    KEYRING_SERVICE = "kite-hft"
+    
+    def __init__(self, master_password: Optional[str] = None,
+                 use_keyring_cache: Optional[bool] = None):
         """
         Initialize encryption with master password
         
         Args:
             master_password: Master password for encryption. If None, will prompt.
+            use_keyring_cache: Keep the derived key in the OS keyring so later
+                processes decrypt without the password or the KDF. The entry
+                decrypts the credentials on its own, so this is opt-in:
+                defaults to KITE_KEYRING_CACHE=1; needs the keyring package.
         """
         self.master_password = master_password
+        if use_keyring_cache is None:
+            use_keyring_cache = os.getenv('KITE_KEYRING_CACHE', '0') != '0'
+        self.use_keyring_cache = use_keyring_cache and keyring is not None
+        self._keyring_key = None  # Raw key the keyring entry was last seen holding
         self.salt_file = Path("config/.salt")
         self.credentials_file = Path("config/credentials.encrypted")
         
@@ -47,32 +131,79 @@ class CredentialEncryption:
     
     def _get_or_create_salt(self) -> bytes:
         """Get existing salt or create new one"""
+        if self.salt_file.is_file():
+            salt = self.salt_file.read_bytes()
+            logger.debug("Loaded existing salt")
+            return salt
+        
+        # Generate new salt
+        salt = os.urandom(16)
         try:
-            if self.salt_file.exists():
-                with open(self.salt_file, 'rb') as f:
-                    salt = f.read()
-                logger.debug("Loaded existing salt")
-                return salt
-            else:
-                # Generate new salt
-                salt = os.urandom(16)
-                with open(self.salt_file, 'wb') as f:
-                    f.write(salt)
-                logger.info("Generated new salt")
-                return salt
-        except Exception as e:
-            logger.error(f"Error handling salt: {e}")
+            _write_private_file(self.salt_file, salt)
+        except OSError as e:
+            logger.error(f"Error writing salt: {e}")
             raise
+        logger.info("Generated new salt")
+        return salt
+    
+    def _derive_key(self, password: str, kdf_format: bytes = _FORMAT_SCRYPT) -> bytes:
+        """Derive encryption key from password using scrypt, or PBKDF2 for old files (memoized)"""
+        return _derive_key_cached(password.encode(), self.salt, kdf_format)
+    
+    def _keyring_username(self) -> str:
+        """Keyring entry name for the current salt"""
+        return hashlib.sha256(self.salt).hexdigest()
+    
+    def _load_cached_key(self) -> Optional[bytes]:
+        """Get the derived key from the OS keyring, if cached there"""
+        if not self.use_keyring_cache:
+            return None
+        try:
+            key = keyring.get_password(self.KEYRING_SERVICE, self._keyring_username())
+        except Exception as e:
+            logger.debug(f"Keyring lookup failed: {e}")
+            return None
+        self._keyring_key = base64.urlsafe_b64decode(key) if key else None
+        return self._keyring_key
+    
+    def _store_cached_key(self, key: bytes):
+        """Save the derived key to the OS keyring (best effort)"""
+        # Every encrypt passes its key here; skip the encode and keyring
+        # round-trip when the entry already holds it
+        if not self.use_keyring_cache or key == self._keyring_key:
+            return
+        try:
+            keyring.set_password(self.KEYRING_SERVICE, self._keyring_username(),
+                                 base64.urlsafe_b64encode(key).decode())
+            self._keyring_key = key
+        except Exception as e:
+            logger.debug(f"Could not cache key in keyring: {e}")
     
-    def _derive_key(self, password: str) -> bytes:
-        """Derive encryption key from password using PBKDF2"""
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,  # 256 bits for AES-256
-            salt=self.salt,
-            iterations=100000,  # High iteration count for security
-        )
-        return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+    def _delete_cached_key(self):
+        """Remove the derived key from the OS keyring"""
+        if not self.use_keyring_cache:
+            return
+        self._keyring_key = None
+        try:
+            keyring.delete_password(self.KEYRING_SERVICE, self._keyring_username())
+        except Exception as e:
+            logger.debug(f"No keyring entry removed: {e}")
+    
+    def _decrypt_file(self, encrypted_data: bytes) -> bytes:
+        """Decrypt with the keyring copy of the key, else the master password's key"""
+        key = self._load_cached_key()
+        if key is not None:
+            try:
+                return self._decrypt(key, encrypted_data)
+            except (InvalidTag, InvalidToken):
+                # Stale entry, e.g. the file was re-encrypted with the cache off
+                logger.warning("Keyring key does not match the credentials file; using the master password")
+                self._delete_cached_key()
+        
+        key = self._derive_key(self._get_master_password(), self._kdf_format(encrypted_data))
+        plaintext = self._decrypt(key, encrypted_data)
+        self._store_cached_key(key)
+        return plaintext
     
     def _get_master_password(self) -> str:
         """Get master password from user or environment"""
@@ -118,31 +249,61 @@ class CredentialEncryption:
             # Get master password
             password = self._get_master_password()
             
-            # Derive encryption key
+            # Derive encryption key (and refresh the keyring copy)
             key = self._derive_key(password)
-            fernet = Fernet(key)
-            
-            # Convert credentials to JSON bytes
-            credentials_json = json.dumps(credentials, indent=2)
-            credentials_bytes = credentials_json.encode()
-            
-            # Encrypt credentials
-            encrypted_data = fernet.encrypt(credentials_bytes)
+            self._store_cached_key(key)
             
-            # Save to file
-            with open(self.credentials_file, 'wb') as f:
-                f.write(encrypted_data)
-            
-            # Set secure file permissions (readable only by owner)
-            os.chmod(self.credentials_file, 0o600)
-            
-            logger.info(f"Credentials encrypted and saved to {self.credentials_file}")
+            self._write_credentials(key, credentials)
             return True
             
         except Exception as e:
             logger.error(f"Failed to encrypt credentials: {e}")
             return False
     
+    def _read_encrypted(self) -> bytes:
+        """Read the encrypted credentials file in one read"""
+        # Unbuffered: FileIO sizes a single read from fstat, with no
+        # BufferedReader copy in between
+        with open(self.credentials_file, 'rb', buffering=0) as f:
+            return f.read()
+    
+    @staticmethod
+    def _kdf_format(encrypted_data: bytes) -> bytes:
+        """Key derivation an encrypted credentials file was written with"""
+        kdf_format = encrypted_data[:1]
+        return kdf_format if kdf_format == _FORMAT_SCRYPT else _FORMAT_PBKDF2
+    
+    @staticmethod
+    def _encrypt(key: bytes, data: bytes) -> bytes:
+        """Encrypt data with AES-256-GCM under a fresh nonce (scrypt-keyed format)"""
+        nonce = os.urandom(_NONCE_SIZE)
+        return _FORMAT_SCRYPT + nonce + _cipher_for(key).encrypt(nonce, data, _FORMAT_SCRYPT)
+    
+    @staticmethod
+    def _decrypt(key: bytes, encrypted_data: bytes) -> bytes:
+        """Decrypt an encrypted credentials file (AES-GCM or legacy Fernet)"""
+        if encrypted_data[:1] not in (_FORMAT_PBKDF2, _FORMAT_SCRYPT):
+            # Written before the AES-GCM format; the next write upgrades it
+            return Fernet(base64.urlsafe_b64encode(key)).decrypt(encrypted_data)
+        
+        # Slices of the memoryview pass the nonce and ciphertext without copies
+        view = memoryview(encrypted_data)
+        nonce_end = 1 + _NONCE_SIZE
+        return _cipher_for(key).decrypt(view[1:nonce_end], view[nonce_end:], view[:1])
+    
+    def _write_credentials(self, key: bytes, credentials: Dict[str, Any]):
+        """Encrypt credentials with key and save them to file"""
+        # Convert credentials to JSON bytes
+        credentials_bytes = _json_dumps(credentials)
+        
+        # Encrypt credentials
+        encrypted_data = self._encrypt(key, credentials_bytes)
+        
+        # Save to file, created readable only by owner (no window before a chmod)
+        _write_private_file(self.credentials_file, encrypted_data)
+        
+        logger.info(f"Credentials encrypted and saved to {self.credentials_file}")
+    
     def decrypt_credentials(self) -> Optional[Dict[str, Any]]:
         """
         Decrypt and load credentials from file
@@ -151,32 +312,24 @@ class CredentialEncryption:
             Dictionary containing decrypted credentials or None if failed
         """
         try:
-            if not self.credentials_file.exists():
-                logger.warning(f"Credentials file not found: {self.credentials_file}")
-                return None
+            # A missing file surfaces as FileNotFoundError (no separate stat)
+            encrypted_data = self._read_encrypted()
             
-            # Get master password
-            password = self._get_master_password()
-            
-            # Derive encryption key
-            key = self._derive_key(password)
-            fernet = Fernet(key)
-            
-            # Read encrypted data
-            with open(self.credentials_file, 'rb') as f:
-                encrypted_data = f.read()
-            
-            # Decrypt credentials
-            decrypted_bytes = fernet.decrypt(encrypted_data)
-            credentials_json = decrypted_bytes.decode()
-            
-            # Parse JSON
-            credentials = json.loads(credentials_json)
+            # Decrypt credentials; json parses the UTF-8 bytes directly
+            decrypted_bytes = self._decrypt_file(encrypted_data)
+            credentials = _json_loads(decrypted_bytes)
             
             logger.debug("Credentials decrypted successfully")
             return credentials
             
-        except Exception as e:
+        except FileNotFoundError:
+            logger.warning(f"Credentials file not found: {self.credentials_file}")
+            return None
+        except (InvalidTag, InvalidToken):
+            logger.error("Failed to decrypt credentials: wrong master password or corrupted file")
+            return None
+        except (OSError, ValueError) as e:
+            # Unreadable file, no master password available, or bad JSON
             logger.error(f"Failed to decrypt credentials: {e}")
             return None
     
@@ -191,23 +344,48 @@ class CredentialEncryption:
         Returns:
             True if successful, False otherwise
         """
+        return self.update_credentials_batch({key: value})
+    
+    def update_credentials_batch(self, updates: Dict[str, Any]) -> bool:
+        """
+        Update several credentials with one key derivation and one write
+        
+        Args:
+            updates: Credential keys and their new values
+            
+        Returns:
+            True if successful, False otherwise (the file is left untouched
+            if the existing credentials cannot be decrypted)
+        """
         try:
-            # Load existing credentials
-            credentials = self.decrypt_credentials() or {}
+            password = self._get_master_password()
+            key = self._derive_key(password)
+            self._store_cached_key(key)
             
-            # Update credential
-            credentials[key] = value
+            # Load existing credentials (older files need their own KDF's key)
+            try:
+                encrypted_data = self._read_encrypted()
+            except FileNotFoundError:
+                credentials = {}
+            else:
+                kdf_format = self._kdf_format(encrypted_data)
+                read_key = key if kdf_format == _FORMAT_SCRYPT else self._derive_key(password, kdf_format)
+                credentials = _json_loads(self._decrypt(read_key, encrypted_data))
             
-            # Save updated credentials
-            return self.encrypt_credentials(credentials)
+            credentials.update(updates)
+            self._write_credentials(key, credentials)
+            return True
             
         except Exception as e:
-            logger.error(f"Failed to update credential {key}: {e}")
+            logger.error(f"Failed to update credentials {list(updates)}: {e}")
             return False
     
     def delete_credentials(self) -> bool:
         """Delete encrypted credentials file"""
         try:
+            # Entry name depends on the salt, so remove it before the salt goes
+            self._delete_cached_key()
+            
             if self.credentials_file.exists():
                 self.credentials_file.unlink()
                 logger.info("Encrypted credentials file deleted")
@@ -216,6 +394,10 @@ class CredentialEncryption:
                 self.salt_file.unlink()
                 logger.info("Salt file deleted")
             
+            # Drop derived keys and their ciphers along with the credentials
+            _derive_key_cached.cache_clear()
+            _cipher_for.cache_clear()
+            
             return True
             
         except Exception as e:
@@ -232,7 +414,13 @@ class SecureCredentialManager:
         """Initialize secure credential manager"""
         self.encryption = CredentialEncryption()
         self.credentials_cache = {}
+        self.credentials_view = MappingProxyType(self.credentials_cache)  # Read-only, handed out
         self.cache_loaded = False
+        self.cache_mtime_ns = None  # Credentials file mtime the cache was loaded from
+        self.configured = None  # Whether the credentials file exists; None = unknown
+        # Serializes cache loads and writes, so a cold-cache burst of callers
+        # runs one key derivation and decrypt instead of one each
+        self.cache_lock = threading.RLock()
         
         logger.debug("SecureCredentialManager initialized")
     
@@ -246,6 +434,8 @@ class SecureCredentialManager:
         Returns:
             True if successful, False otherwise
         """
+        # Whatever happens below may create the credentials file
+        self.configured = None
         try:
             if interactive:
                 print("\n🔐 Secure Credential Setup")
@@ -335,24 +525,57 @@ class SecureCredentialManager:
             logger.error(f"Environment credential setup failed: {e}")
             return False
     
-    def get_credentials(self) -> Optional[Dict[str, Any]]:
+    def get_credentials(self) -> Optional[Mapping[str, Any]]:
         """
         Get decrypted credentials
         
         Returns:
-            Dictionary containing credentials or None if failed
+            Read-only mapping of the credentials (dict(...) it to modify)
+            or None if failed
         """
         try:
-            if not self.cache_loaded:
-                self.credentials_cache = self.encryption.decrypt_credentials() or {}
-                self.cache_loaded = True
-            
-            return self.credentials_cache.copy()  # Return copy to prevent modification
+            # Decrypt once per version of the credentials file
+            mtime_ns = self._get_credentials_mtime_ns()
+            if not self.cache_loaded or mtime_ns != self.cache_mtime_ns:
+                with self.cache_lock:
+                    # Another caller may have loaded this version while we waited
+                    if not self.cache_loaded or mtime_ns != self.cache_mtime_ns:
+                        self._set_cache(self.encryption.decrypt_credentials() or {})
+                        self.cache_loaded = True
+                        self.cache_mtime_ns = mtime_ns
+            
+            return self.credentials_view  # Read-only view, so no per-call copy
             
         except Exception as e:
             logger.error(f"Failed to get credentials: {e}")
             return None
     
+    async def get_credentials_async(self) -> Optional[Mapping[str, Any]]:
+        """
+        get_credentials for event-loop callers
+        
+        A cache miss (key derivation + decrypt) runs in the default executor
+        so it does not block the loop; concurrent misses share one load.
+        """
+        if self.cache_loaded and self._get_credentials_mtime_ns() == self.cache_mtime_ns:
+            return self.credentials_view
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_credentials)
+    
+    def _set_cache(self, credentials: Dict[str, Any]):
+        """Replace the cached credentials and the read-only view over them"""
+        self.credentials_cache = credentials
+        self.credentials_view = MappingProxyType(credentials)
+    
+    def _get_credentials_mtime_ns(self) -> Optional[int]:
+        """Get modification time of the credentials file (None if missing)"""
+        try:
+            mtime_ns = os.stat(self.encryption.credentials_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        self.configured = mtime_ns is not None  # Free with the stat
+        return mtime_ns
+    
     def get_credential(self, key: str) -> Optional[str]:
         """
         Get a specific credential value
@@ -363,8 +586,10 @@ class SecureCredentialManager:
         Returns:
             Credential value or None if not found
         """
-        credentials = self.get_credentials()
-        return credentials.get(key) if credentials else None
+        # get_credentials refreshes the cache; read it without the proxy
+        if self.get_credentials() is None:
+            return None
+        return self.credentials_cache.get(key)
     
     def update_credential(self, key: str, value: str) -> bool:
         """
@@ -377,28 +602,77 @@ class SecureCredentialManager:
         Returns:
             True if successful, False otherwise
         """
-        success = self.encryption.update_credential(key, value)
+        return self.update_credentials({key: value})
+    
+    def update_credentials(self, updates: Dict[str, Any]) -> bool:
+        """
+        Update several credentials at once
+        
+        Args:
+            updates: Credential keys and their new values
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        with self.cache_lock:
+            if self.cache_loaded and self.credentials_cache and \
+                    self._get_credentials_mtime_ns() == self.cache_mtime_ns:
+                # The cache mirrors the file: apply the updates and re-encrypt it,
+                # skipping the decrypt round-trip
+                credentials = {**self.credentials_cache, **updates}
+                return self._flush_cache(credentials)
+            
+            success = self.encryption.update_credentials_batch(updates)
+            if success:
+                # Clear cache to force reload
+                self.cache_loaded = False
+                self._set_cache({})  # Views handed out keep their snapshot
+                self.configured = True
+            return success
+    
+    def _flush_cache(self, credentials: Dict[str, Any]) -> bool:
+        """Encrypt credentials to file and keep them as the cache"""
+        success = self.encryption.encrypt_credentials(credentials)
         if success:
-            # Clear cache to force reload
-            self.cache_loaded = False
-            self.credentials_cache.clear()
+            self._set_cache(credentials)
+            self.cache_mtime_ns = self._get_credentials_mtime_ns()
         return success
     
     def is_configured(self) -> bool:
-        """Check if credentials are configured"""
-        return self.encryption.credentials_file.exists()
+        """Check if credentials are configured (stat only until the answer is known)"""
+        if self.configured is None:
+            self._get_credentials_mtime_ns()
+        return self.configured
     
     def reset_credentials(self) -> bool:
         """Reset all credentials (delete encrypted file)"""
-        success = self.encryption.delete_credentials()
-        if success:
-            self.cache_loaded = False
-            self.credentials_cache.clear()
-        return success
+        with self.cache_lock:
+            success = self.encryption.delete_credentials()
+            if success:
+                self.cache_loaded = False
+                self._set_cache({})
+                self.configured = False
+            return success
+
+
+# Global credential manager instance, built on first use so that importing
+# this module does not create the config directory or read the salt file
+_credential_manager = None
+
+
+def get_credential_manager() -> SecureCredentialManager:
+    """Get the global credential manager, creating it on first call"""
+    global _credential_manager
+    if _credential_manager is None:
+        _credential_manager = SecureCredentialManager()
+    return _credential_manager
 
 
-# Global credential manager instance
-credential_manager = SecureCredentialManager()
+def __getattr__(name: str):
+    """Resolve ``credential_manager`` lazily (PEP 562)"""
+    if name == 'credential_manager':
+        return get_credential_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def setup_credentials_cli():
@@ -410,6 +684,7 @@ def setup_credentials_cli():
     parser.add_argument("--from-env", action="store_true", help="Setup from environment variables")
     
     args = parser.parse_args()
+    credential_manager = get_credential_manager()
     
     try:
         if args.reset:
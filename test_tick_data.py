@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test script for the tick data structures and binary tick parsing
+"""
+
+import os
+import random
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+
+def _ticks(tokens, first_price: float = 0.0) -> np.ndarray:
+    """TICK_DTYPE batch for the given tokens, priced first_price, first_price + 1, ..."""
+    from src.datafeed.tick_data import TICK_DTYPE
+    
+    ticks = np.zeros(len(tokens), dtype=TICK_DTYPE)
+    ticks['instrument_token'] = tokens
+    ticks['last_price'] = first_price + np.arange(len(tokens))
+    return ticks
+
+
+def test_ring_buffer_batch_larger_than_ring():
+    """A batch larger than the ring keeps only its newest ticks"""
+    from src.datafeed.tick_data import RingBuffer
+    
+    ring = RingBuffer(8)
+    ring.push_batch(_ticks([1, 2, 3]))
+    assert ring.push_batch(_ticks(np.arange(20), 100.0)) == 8
+    
+    latest = ring.get_latest(100)
+    assert latest['instrument_token'].tolist() == list(range(12, 20))
+    assert latest['last_price'].tolist() == [112.0 + i for i in range(8)]
+    assert ring.get_latest(3)['instrument_token'].tolist() == [17, 18, 19]
+    assert ring.get_by_instrument(1).size == 0
+
+
+def test_ring_buffer_interleaved_instruments():
+    """get_by_instrument returns each instrument's ticks in arrival order across batches"""
+    from src.datafeed.tick_data import RingBuffer
+    
+    ring = RingBuffer(64)
+    for batch in range(5):
+        ring.push_batch(_ticks([7, 9, 7, 11], 10.0 * batch))
+    
+    assert ring.get_by_instrument(7, 100)['last_price'].tolist() == \
+        [0.0, 2.0, 10.0, 12.0, 20.0, 22.0, 30.0, 32.0, 40.0, 42.0]
+    assert ring.get_by_instrument(7, 3)['last_price'].tolist() == [32.0, 40.0, 42.0]
+    assert ring.get_by_instrument(11, 2)['last_price'].tolist() == [33.0, 43.0]
+    assert ring.get_by_instrument(5).size == 0
+
+
+def test_ring_buffer_index_after_wraparound():
+    """After more than size writes only ticks still in the ring are returned, and stale index entries go"""
+    from src.datafeed.tick_data import RingBuffer
+    
+    ring = RingBuffer(16)
+    ring.push_batch(_ticks([1, 2] * 4))
+    assert ring.get_by_instrument(1).size == 4  # Indexes instrument 1
+    
+    # Ticks 0 and 2 are overwritten, but their index chunk is still live
+    ring.push_batch(_ticks([3] * 11, 100.0))
+    assert ring.get_by_instrument(1, 100)['last_price'].tolist() == [4.0, 6.0]
+    
+    # Instrument 1 stops trading; instrument 2 keeps going past several ring lengths
+    for batch in range(10):
+        ring.push_batch(_ticks([2] * 5, 100.0 + 5 * batch))
+        ring.get_by_instrument(2, 1)  # Queries keep the index up to date
+    
+    assert ring.get_by_instrument(1).size == 0
+    assert 1 not in ring._index
+    
+    ticks = ring.get_by_instrument(2, 100)
+    assert ticks['last_price'].tolist() == [134.0 + i for i in range(16)]
+    assert ring.get_by_instrument(3).size == 0
+    assert sum(len(chunk) for chunk in ring._index[2]) <= 2 * ring.size
+
+
+def test_ring_buffer_push_batch_and_copy():
+    """push_batch_and_copy fills the chunk up to its free space and writes the whole batch to the ring"""
+    from src.datafeed.tick_data import RingBuffer, TICK_DTYPE
+    
+    ring = RingBuffer(8)
+    chunk = np.zeros(10, dtype=TICK_DTYPE)
+    chunk[:6] = _ticks([0] * 6)
+    batch = _ticks([3, 4] * 5, 50.0)
+    
+    assert ring.push_batch_and_copy(batch, chunk, 6) == 4
+    assert np.array_equal(chunk[6:], batch[:4])
+    assert np.array_equal(chunk[:6], _ticks([0] * 6))
+    
+    # The ring keeps its newest 8 ticks even though the chunk filled up
+    assert np.array_equal(ring.get_latest(8), batch[2:])
+    assert ring.get_by_instrument(4, 100)['last_price'].tolist() == [53.0, 55.0, 57.0, 59.0]
+
+
+def test_tick_aggregator_bars():
+    """Bars roll over per interval, late ticks fold into the current bar, and history wraps"""
+    from src.datafeed.tick_data import TickAggregator
+    
+    aggregator = TickAggregator(aggregation_interval=1000, max_bars=3)
+    
+    ticks = _ticks([5, 5, 8, 5], 100.0)
+    ticks['timestamp'] = [10_000, 10_400, 10_500, 10_900]
+    ticks['volume'] = [1, 2, 3, 4]
+    assert aggregator.process_batch(ticks) == []
+    
+    # The next interval completes instrument 5's bar; a late tick for the
+    # old interval then folds into the new current bar
+    ticks = _ticks([5, 5], 90.0)
+    ticks['timestamp'] = [11_100, 10_950]
+    ticks['volume'] = [5, 6]
+    completed = aggregator.process_batch(ticks)
+    assert completed == [{'instrument_token': 5, 'timestamp': 10_000, 'open': 100.0, 'high': 103.0,
+                          'low': 100.0, 'close': 103.0, 'volume': 7, 'tick_count': 3}]
+    assert aggregator.get_current_bar(5) == {
+        'instrument_token': 5, 'timestamp': 11_000, 'open': 90.0, 'high': 91.0,
+        'low': 90.0, 'close': 91.0, 'volume': 11, 'tick_count': 2}
+    assert aggregator.get_current_bar(8)['tick_count'] == 1
+    
+    # Complete four more bars; only the last max_bars are kept, oldest first
+    for second in range(12, 17):
+        ticks = _ticks([5], float(second))
+        ticks['timestamp'] = second * 1000
+        aggregator.process_batch(ticks)
+    
+    bars = aggregator.get_bars(5, 100)
+    assert bars['timestamp'].tolist() == [13_000, 14_000, 15_000]
+    assert bars['open'].tolist() == [13.0, 14.0, 15.0]
+    assert aggregator.get_bars(5, 2)['timestamp'].tolist() == [14_000, 15_000]
+    assert aggregator.get_bars(8).size == 0  # Bar still open
+    assert aggregator.get_bars(42).size == 0
+
+
+def test_performance_stats_after_sample_wraparound():
+    """get_stats must work once more ticks are recorded than samples are kept"""
+    from src.datafeed.tick_data import PerformanceMonitor
+    
+    monitor = PerformanceMonitor(max_samples=1000)
+    tokens = np.array([256265, 260105], dtype=np.int64)
+    for i in range(1500):
+        monitor.record_batch(tokens, 0.001 * (i % 10 + 1))
+    
+    stats = monitor.get_stats()
+    assert stats['total_ticks'] == 3000
+    assert stats['instruments_count'] == 2
+    assert stats['p95_processing_time'] <= stats['p99_processing_time'] <= stats['max_processing_time']
+
+
+
+def _binary_packet(length: int, token: int, rng: random.Random) -> bytes:
+    """Kite binary packet of the given length with random field values"""
+    body = bytearray(struct.pack('>I', token))
+    while len(body) < length:
+        body += struct.pack('>I', rng.randrange(1, 10**7))
+    body = body[:length]
+    if length == 184:
+        # Depth entries are quantity, price, orders (uint16) and 2 bytes padding
+        for level in range(10):
+            offset = 64 + 12 * level
+            body[offset + 8:offset + 12] = struct.pack('>HH', rng.randrange(100), 0)
+    timestamp_offset = {32: 28, 184: 60}.get(length)
+    if timestamp_offset:
+        body[timestamp_offset:timestamp_offset + 4] = struct.pack('>I', 1700000000 + rng.randrange(10**6))
+    return bytes(body)
+
+
+def test_fast_parser_matches_kite_ticker(kite_env):
+    """FastKiteTicker must decode every packet type exactly like KiteTicker"""
+    from kiteconnect import KiteTicker
+    from src.datafeed.datafeed import FastKiteTicker, DataFeedService
+    
+    rng = random.Random(7)
+    packets = []
+    # NSE, NFO, CDS (own price divisor), BSE, indices
+    for segment in (1, 2, 3, 4, 9):
+        for length in (8, 28, 32, 44, 184):
+            packets.append(_binary_packet(length, (rng.randrange(1, 10**5) << 8) | segment, rng))
+    packets.append(bytes(12))  # Unknown length, skipped by both parsers
+    message = struct.pack('>H', len(packets)) + b''.join(
+        struct.pack('>H', len(packet)) + packet for packet in packets)
+    
+    fast = FastKiteTicker('key', 'token')._parse_binary(message)
+    expected = DataFeedService._build_tick_batch(KiteTicker('key', 'token')._parse_binary(message))
+    
+    assert len(fast) == len(expected) == len(packets) - 1
+    for name in fast.dtype.names:
+        if name == 'timestamp':  # Receive time
+            continue
+        assert np.array_equal(fast[name], expected[name]), name
+
+
+if __name__ == "__main__":
+    from conftest import TEST_KITE_ENV
+    os.environ.update(TEST_KITE_ENV)
+    
+    test_ring_buffer_batch_larger_than_ring()
+    test_ring_buffer_interleaved_instruments()
+    test_ring_buffer_index_after_wraparound()
+    test_ring_buffer_push_batch_and_copy()
+    test_tick_aggregator_bars()
+    test_performance_stats_after_sample_wraparound()
+    test_fast_parser_matches_kite_ticker(None)
+    print("✅ Tick data tests passed")
\ No newline at end of file